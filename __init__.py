@@ -32,20 +32,40 @@ bl_info = {
 
 if "bpy" in locals():
     import importlib
+    if "bone_roles" in locals():
+        importlib.reload(bone_roles)
     if "bake_operators" in locals():
         importlib.reload(bake_operators)
     if "car_rig" in locals():
         importlib.reload(car_rig)
     if "widgets" in locals():
         importlib.reload(widgets)
-    if "amimations_operators" in locals():
+    if "utilities_operators" in locals():
         importlib.reload(utilities_operators)
+    if "batch_operators" in locals():
+        importlib.reload(batch_operators)
+    if "template_operators" in locals():
+        importlib.reload(template_operators)
+    if "ground_operators" in locals():
+        importlib.reload(ground_operators)
+    if "dynamics_operators" in locals():
+        importlib.reload(dynamics_operators)
+    if "export_operators" in locals():
+        importlib.reload(export_operators)
 else:
     import bpy
-    
+    from bpy.app.handlers import persistent
+
+    from . import bone_roles
     from . import bake_operators
     from . import utilities_operators
     from . import car_rig
+    from . import widgets
+    from . import batch_operators
+    from . import template_operators
+    from . import ground_operators
+    from . import dynamics_operators
+    from . import export_operators
 
     #
     # import sys
@@ -56,19 +76,18 @@ else:
     # import car_rig
 
 
-def enumerate_ground_sensors(bones):
-    bone = bones.get('GroundSensor.Axle.Ft')
-    if bone is not None:
-        yield bone
-        for bone in bones:
-            if bone.name.startswith('GroundSensor.Ft'):
-                yield bone
-    bone = bones.get('GroundSensor.Axle.Bk')
-    if bone is not None:
-        yield bone
-        for bone in bones:
-            if bone.name.startswith('GroundSensor.Bk'):
-                yield bone
+def enumerate_ground_sensors(ob):
+    bones = ob.pose.bones
+    roles = bone_roles.get_roles(ob)
+    for position in bone_roles.POSITIONS:
+        bone = bones.get(roles.name('GroundSensor.Axle', position) or '')
+        if bone is not None:
+            yield bone
+            for name in roles.names('GroundSensor', position):
+                bone = bones.get(name)
+                if bone is not None:
+                    yield bone
+
 
 def get_follow_path_constraint(bones):
     for b in bones:
@@ -77,6 +96,49 @@ def get_follow_path_constraint(bones):
                 return c
 
 
+class PanelData(object):
+    """Names of the bones displayed by the panels for a rig."""
+
+    def __init__(self, ob):
+        self.data_pointer = ob.data.as_pointer()
+        self.ground_sensors = [b.name for b in enumerate_ground_sensors(ob)]
+
+
+panel_data_cache = {}
+
+
+def get_panel_data(ob):
+    """
+    Panels are redrawn on every mouse move: the scan of the pose bones is done once
+    and kept until a depsgraph update touches the rig.
+    """
+    key = ob.as_pointer()
+    panel_data = panel_data_cache.get(key)
+    if panel_data is None or panel_data.data_pointer != ob.data.as_pointer():
+        panel_data = panel_data_cache[key] = PanelData(ob)
+    return panel_data
+
+
+@persistent
+def invalidate_panel_data(scene, depsgraph=None):
+    if not panel_data_cache:
+        return
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Object):
+            panel_data_cache.pop(update.id.original.as_pointer(), None)
+        elif isinstance(update.id, bpy.types.Armature):
+            pointer = update.id.original.as_pointer()
+            for key in [k for k, v in panel_data_cache.items() if v.data_pointer == pointer]:
+                del panel_data_cache[key]
+
+
+@persistent
+def clear_panel_data(dummy):
+    panel_data_cache.clear()
+
+
 class RIGACAR_PT_mixin:
 
     def __init__(self):
@@ -96,13 +158,21 @@ class RIGACAR_PT_mixin:
 
     def display_physics_section(self, context):
         layout = self.layout.column()
-        layout.prop(context.object, '["sb_mass"]', text="Mass")
-        layout.prop(context.object, '["sb_friction"]', text="Friction")
-        layout.prop(context.object, '["sb_stiffness"]', text="Stiffness")
-        layout.prop(context.object, '["sb_pitch"]', text="Pitch factor")
-        layout.prop(context.object, '["sb_roll"]', text="Roll factor")
-        # self.layout.operator(bake_operators.ANIM_OT_carBakePhysics.bl_idname)
-        # self.layout.operator(bake_operators.ANIM_OT_carClearPhysics.bl_idname)
+        # rigs generated by older versions may lack some of the parameters
+        for name, text in (('sb_mass', "Mass"), ('sb_friction', "Friction"), ('sb_stiffness', "Stiffness"),
+                           ('sb_pitch', "Pitch factor"), ('sb_roll', "Roll factor")):
+            if name in context.object:
+                layout.prop(context.object, '["%s"]' % name, text=text)
+        self.layout.operator(dynamics_operators.ANIM_OT_carDynamicsBake.bl_idname)
+        self.layout.operator(dynamics_operators.ANIM_OT_carFleetDynamicsBake.bl_idname)
+        if context.object.get(dynamics_operators.PHYSICS_FROZEN_PROPERTY):
+            self.layout.operator(dynamics_operators.ANIM_OT_carPhysicsUnfreeze.bl_idname)
+        else:
+            self.layout.operator(dynamics_operators.ANIM_OT_carPhysicsFreeze.bl_idname)
+        if context.object.get(dynamics_operators.DYNAMICS_PROPERTY):
+            if context.object.name in dynamics_operators.stale_caches:
+                self.layout.label(text='Dynamics cache is outdated', icon='ERROR')
+            self.layout.operator(dynamics_operators.ANIM_OT_carDynamicsClear.bl_idname)
 
     def display_rig_props_section(self, context):
         layout = self.layout.column()
@@ -113,8 +183,18 @@ class RIGACAR_PT_mixin:
         layout.prop(context.object, '["wheel_offset"]', text="Wheel Offset")
         self.layout.operator(bake_operators.ANIM_OT_carSteeringBake.bl_idname)
         self.layout.operator(bake_operators.ANIM_OT_carWheelsRotationBake.bl_idname)
+        self.layout.operator(bake_operators.ANIM_OT_carWheelsRotationRetarget.bl_idname)
+        if context.object.get(bake_operators.WHEELS_ROTATION_LIVE_PROPERTY):
+            self.layout.operator(bake_operators.ANIM_OT_carWheelsRotationLiveStop.bl_idname)
+        else:
+            self.layout.operator(bake_operators.ANIM_OT_carWheelsRotationLive.bl_idname)
         # self.layout.operator(bake_operators.ANIM_OT_carCompleteBake.bl_idname)
         self.layout.operator(bake_operators.ANIM_OT_carClearSteeringWheelsRotation.bl_idname)
+        if context.object.get(ground_operators.SUSPENSION_BAKED_PROPERTY):
+            self.layout.operator(ground_operators.ANIM_OT_carSuspensionClear.bl_idname)
+        else:
+            self.layout.operator(ground_operators.ANIM_OT_carSuspensionBake.bl_idname)
+        self.layout.operator(car_rig.POSE_OT_carAnimationRigRegenerate.bl_idname, text='Regenerate')
 
     # def display_path_properties_section(self, context):
     #     fp_const = get_follow_path_constraint(context.object.pose.bones)
@@ -122,10 +202,25 @@ class RIGACAR_PT_mixin:
 
     def display_utilities_section(self, context):
         self.layout.operator(utilities_operators.OP_CarTansferAnimation.bl_idname)
+        self.layout.operator(utilities_operators.ANIM_OT_carBatchTransferAnimation.bl_idname)
+        self.layout.operator(car_rig.POSE_OT_carDriverReport.bl_idname)
+        self.layout.operator(export_operators.EXPORT_SCENE_OT_carTransforms.bl_idname)
+        self.layout.operator(template_operators.OBJECT_OT_carRigStoreTemplate.bl_idname)
+        if template_operators.is_template(context.object):
+            self.layout.operator(template_operators.OBJECT_OT_carRigInstantiateTemplate.bl_idname)
 
 
     def display_ground_sensors_section(self, context):
-        for ground_sensor in enumerate_ground_sensors(context.object.pose.bones):
+        if context.object.get(ground_operators.GROUND_ENGINE_PROPERTY):
+            self.layout.label(text='Ground contact: %s' % context.object[ground_operators.GROUND_ENGINE_PROPERTY].lower())
+            self.layout.operator(ground_operators.ANIM_OT_carGroundEngineClear.bl_idname)
+        else:
+            self.layout.operator(ground_operators.ANIM_OT_carGroundEngineBake.bl_idname)
+            self.layout.operator(ground_operators.ANIM_OT_carGroundRaycastBake.bl_idname)
+            self.layout.operator(ground_operators.ANIM_OT_carGroundEngineLive.bl_idname)
+        self.layout.operator(ground_operators.OBJECT_OT_carGroundProxy.bl_idname)
+        bones = context.object.pose.bones
+        for ground_sensor in filter(None, map(bones.get, get_panel_data(context.object).ground_sensors)):
             ground_projection_constraint = ground_sensor.constraints.get('Ground projection')
             self.layout.label(text=ground_sensor.name, icon='BONE_DATA')
             if ground_projection_constraint is not None:
@@ -253,12 +348,13 @@ class RIGACAR_PT_groundSensorsView(bpy.types.Panel, RIGACAR_PT_mixin):
 
 def menu_entries(menu, context):
     menu.layout.operator(car_rig.OBJECT_OT_armatureCarDeformationRig.bl_idname, text="Rigacar V2", icon='AUTO')
+    menu.layout.operator(batch_operators.OBJECT_OT_carBatchRigGenerate.bl_idname, text="Rigacar V2 (all vehicles)", icon='AUTO')
 
 # RIGACAR_PT_animationProperties
 
 classes = (
     RIGACAR_PT_rigProperties,
-    #RIGACAR_PT_physicsView,
+    RIGACAR_PT_physicsView,
     RIGACAR_PT_groundSensorsProperties,
     RIGACAR_PT_animationRigView,
     RIGACAR_PT_groundSensorsView,
@@ -272,14 +368,34 @@ def register():
     for c in classes:
         bpy.utils.register_class(c)
 
+    widgets.register()
     car_rig.register()
     bake_operators.register()
     utilities_operators.register()
+    batch_operators.register()
+    template_operators.register()
+    ground_operators.register()
+    dynamics_operators.register()
+    export_operators.register()
+
+    bpy.app.handlers.depsgraph_update_post.append(invalidate_panel_data)
+    bpy.app.handlers.load_post.append(clear_panel_data)
 
 
 def unregister():
+    bpy.app.handlers.load_post.remove(clear_panel_data)
+    bpy.app.handlers.depsgraph_update_post.remove(invalidate_panel_data)
+    panel_data_cache.clear()
+
+    export_operators.unregister()
+    dynamics_operators.unregister()
+    ground_operators.unregister()
+    template_operators.unregister()
+    batch_operators.unregister()
+    utilities_operators.unregister()
     bake_operators.unregister()
     car_rig.unregister()
+    widgets.unregister()
 
     for c in classes:
         bpy.utils.unregister_class(c)
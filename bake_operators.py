@@ -19,11 +19,15 @@
 # <pep8 compliant>
 
 import bpy
-import bpy_extras.anim_utils
 import mathutils
 import math
 import itertools
-import re
+from bpy.app.handlers import persistent
+from .bone_roles import get_roles
+
+WHEELS_ROTATION_LIVE_PROPERTY = 'wheels_rotation_live'
+# the wheels_on_y_axis setting of the rig before the live wheels rotation, restored when it stops
+WHEELS_ON_Y_AXIS_LIVE_PROPERTY = 'wheels_rotation_live_on_y_axis'
 
 
 def cursor(cursor_mode):
@@ -38,38 +42,22 @@ def cursor(cursor_mode):
     return cursor_decorator
 
 
-def bone_name(prefix, position, side, index=0):
-    if index == 0:
-        return '%s.%s.%s' % (prefix, position, side)
-    else:
-        return '%s.%s.%s.%03d' % (prefix, position, side, index)
-
+def bone_range(roles, bones, name_prefix, position, side):
+    for index, name in roles.indexed(name_prefix, position, side):
+        bone = bones.get(name)
+        if bone is not None:
+            yield index, bone
 
-def bone_range(bones, name_prefix, position, side):
-    for index in itertools.count():
-        name = bone_name(name_prefix, position, side, index)
-        if name in bones:
-            yield bones[name]
-        else:
-            break
 
-
-def find_wheelbrake_bone(bones, position, side, index):
+def find_wheelbrake_bone(roles, bones, position, side, index):
     other_side = 'R' if side == 'L' else 'L'
-    name_prefix = 'WheelBrake'
-    bone = bones.get(bone_name(name_prefix, position, side, index))
-    if bone:
-        return bone
-    bone = bones.get(bone_name(name_prefix, position, other_side, index))
-    if bone:
-        return bone
+    candidates = [(side, index), (other_side, index)]
     if index > 0:
-        bone = bones.get(bone_name(name_prefix, position, side))
-        if bone:
-            return bone
-        bone = bones.get(bone_name(name_prefix, position, other_side))
-        if bone:
-            return bone
+        candidates += [(side, 0), (other_side, 0)]
+    for brake_side, brake_index in candidates:
+        name = roles.name('WheelBrake', position, brake_side, brake_index)
+        if name is not None and name in bones:
+            return bones[name]
     backward_compatible_bone_name = '%s Wheels' % ('Front' if position == 'Ft' else 'Back')
     return bones.get(backward_compatible_bone_name)
 
@@ -90,6 +78,123 @@ def create_property_animation(context, property_name):
     return action.fcurves.new(fcurve_datapath, index=0, action_group='Wheels rotation')
 
 
+def pose_bone_matrices(ob, indices=None):
+    """
+    Armature space matrices of the pose bones read with a single foreach_get,
+    as a (bones, 4, 4) array of row-major matrices (the same layout as mathutils.Matrix).
+    """
+    import numpy as np
+    pose_bones = ob.pose.bones
+    buffer = np.empty(len(pose_bones) * 16, dtype=np.float32)
+    pose_bones.foreach_get('matrix', buffer)
+    matrices = buffer.reshape(-1, 4, 4).transpose(0, 2, 1)
+    return matrices if indices is None else matrices[indices]
+
+
+def sample_bone_matrices(scene, rigs, frames):
+    """
+    Evaluate the scene once per frame and return the world matrices of bones of several rigs.
+    rigs is a sequence of (object, bone names); the result is a list with one (frames, bones, 4, 4) array per rig.
+    """
+    import numpy as np
+    indices = [np.array([ob.pose.bones.find(name) for name in names], dtype=np.int64) for ob, names in rigs]
+    samples = [np.empty((len(frames), len(names), 4, 4), dtype=np.float32) for _, names in rigs]
+    frame_current = scene.frame_current
+    try:
+        for i, f in enumerate(frames):
+            scene.frame_set(f)
+            for (ob, _), bone_indices, sample in zip(rigs, indices, samples):
+                sample[i] = np.asarray(ob.matrix_world, dtype=np.float32) @ pose_bone_matrices(ob, bone_indices)
+    finally:
+        scene.frame_set(frame_current)
+    return samples
+
+
+def write_fcurve_samples(action, data_path, index, frames, values, action_group=''):
+    """Replace an FCurve of the action by one key per sample, inserted in bulk."""
+    import numpy as np
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is not None:
+        action.fcurves.remove(fcurve)
+    fcurve = action.fcurves.new(data_path, index=index, action_group=action_group)
+    fcurve.keyframe_points.add(len(frames))
+    co = np.empty(len(frames) * 2, dtype=np.float32)
+    co[0::2] = frames
+    co[1::2] = values
+    fcurve.keyframe_points.foreach_set('co', co)
+    fcurve.update()
+    return fcurve
+
+
+WHEEL_RADII_PROPERTY = 'Car Rig Wheel Radii'
+
+
+def wheel_radii(ob):
+    """Radius of each wheel of a rig by the name of its rotation property, the length of its MCH-Wheel.rotation bone."""
+    bones = ob.data.bones
+    radii = {}
+    for bone_name in get_roles(ob).names('MCH-Wheel.rotation'):
+        bone = bones.get(bone_name)
+        if bone is not None:
+            radii[bone_name.replace('MCH-', '', 1)] = bone.length if bone.length > .0 else 1.0
+    return radii
+
+
+def record_wheel_radii(action, radii):
+    """Remember in the action the radii of the wheels its rotation curves are baked for."""
+    recorded = action.get(WHEEL_RADII_PROPERTY)
+    recorded = recorded.to_dict() if recorded is not None else {}
+    recorded.update(radii)
+    action[WHEEL_RADII_PROPERTY] = recorded
+
+
+def rescale_fcurve(fcurve, ratio):
+    """Multiply the values of the keyframes and of their handles, in bulk."""
+    import numpy as np
+    keyframe_points = fcurve.keyframe_points
+    co = np.empty(len(keyframe_points) * 2, dtype=np.float32)
+    for attribute in ('co', 'handle_left', 'handle_right'):
+        keyframe_points.foreach_get(attribute, co)
+        co[1::2] *= ratio
+        keyframe_points.foreach_set(attribute, co)
+    fcurve.update()
+
+
+def retarget_wheels_rotation(ob, action, source_radii=None):
+    """
+    Rescale the wheel rotation curves of action, baked for source_radii (by default the radii recorded in the action
+    at bake time), to the wheels of ob. A shared action is copied first. Return the action holding the rescaled curves,
+    to be assigned to ob by the caller, and the number of curves rescaled.
+    """
+    if source_radii is None:
+        source_radii = action.get(WHEEL_RADII_PROPERTY)
+        source_radii = source_radii.to_dict() if source_radii is not None else {}
+    target_radii = wheel_radii(ob)
+    ratios = {}
+    for property_name, radius in target_radii.items():
+        source_radius = source_radii.get(property_name)
+        if source_radius and abs(source_radius / radius - 1) > 1e-6 and \
+                action.fcurves.find('["%s"]' % property_name) is not None:
+            ratios[property_name] = source_radius / radius
+    if not ratios:
+        return action, 0
+
+    if action.users > 1:
+        action = action.copy()
+    for property_name, ratio in ratios.items():
+        rescale_fcurve(action.fcurves.find('["%s"]' % property_name), ratio)
+    record_wheel_radii(action, {property_name: target_radii[property_name] for property_name in ratios})
+    return action, len(ratios)
+
+
+def wheel_speed(pos, prev_pos, brake, bone_orientation, radius):
+    """Rotation of a wheel of the given radius moving from prev_pos to pos, reversed when the brake scale is below .5."""
+    speed_vector = pos - prev_pos
+    speed_vector *= 2 * brake - 1
+    speed = math.copysign(speed_vector.magnitude, bone_orientation.dot(speed_vector))
+    return speed / radius
+
+
 class FCurvesEvaluator(object):
     """Encapsulates a bunch of FCurves for vector animations."""
 
@@ -134,6 +239,32 @@ class QuaternionFCurvesEvaluator(object):
         return mathutils.Quaternion(self.fcurves_evaluator.evaluate(f))
 
 
+def find_fcurves(action, data_path, size):
+    if action is None:
+        return [None] * size
+    return [action.fcurves.find(data_path, index=i) for i in range(size)]
+
+
+def create_euler_evaluator(action, source_bone):
+    fc_root_rot = find_fcurves(action, 'pose.bones["%s"].rotation_euler' % source_bone.name, 3)
+    return EulerToQuaternionFCurvesEvaluator(FCurvesEvaluator(fc_root_rot, default_value=(.0, .0, .0)))
+
+
+def create_quaternion_evaluator(action, source_bone):
+    fc_root_rot = find_fcurves(action, 'pose.bones["%s"].rotation_quaternion' % source_bone.name, 4)
+    return QuaternionFCurvesEvaluator(FCurvesEvaluator(fc_root_rot, default_value=(1.0, .0, .0, .0)))
+
+
+def create_location_evaluator(action, source_bone):
+    fc_root_loc = find_fcurves(action, 'pose.bones["%s"].location' % source_bone.name, 3)
+    return VectorFCurvesEvaluator(FCurvesEvaluator(fc_root_loc, default_value=(.0, .0, .0)))
+
+
+def create_scale_evaluator(action, source_bone):
+    fc_root_loc = find_fcurves(action, 'pose.bones["%s"].scale' % source_bone.name, 3)
+    return VectorFCurvesEvaluator(FCurvesEvaluator(fc_root_loc, default_value=(1.0, 1.0, 1.0)))
+
+
 def fix_old_steering_rotation(rig_object):
     """
     Fix  armature generated with rigacar version < 6.0
@@ -174,24 +305,16 @@ class BakingOperator(object):
         self.layout.prop(self, 'keyframe_tolerance')
 
     def _create_euler_evaluator(self, action, source_bone):
-        fcurve_name = 'pose.bones["%s"].rotation_euler' % source_bone.name
-        fc_root_rot = [action.fcurves.find(fcurve_name, index=i) for i in range(3)]
-        return EulerToQuaternionFCurvesEvaluator(FCurvesEvaluator(fc_root_rot, default_value=(.0, .0, .0)))
+        return create_euler_evaluator(action, source_bone)
 
     def _create_quaternion_evaluator(self, action, source_bone):
-        fcurve_name = 'pose.bones["%s"].rotation_quaternion' % source_bone.name
-        fc_root_rot = [action.fcurves.find(fcurve_name, index=i) for i in range(4)]
-        return QuaternionFCurvesEvaluator(FCurvesEvaluator(fc_root_rot, default_value=(1.0, .0, .0, .0)))
+        return create_quaternion_evaluator(action, source_bone)
 
     def _create_location_evaluator(self, action, source_bone):
-        fcurve_name = 'pose.bones["%s"].location' % source_bone.name
-        fc_root_loc = [action.fcurves.find(fcurve_name, index=i) for i in range(3)]
-        return VectorFCurvesEvaluator(FCurvesEvaluator(fc_root_loc, default_value=(.0, .0, .0)))
+        return create_location_evaluator(action, source_bone)
 
     def _create_scale_evaluator(self, action, source_bone):
-        fcurve_name = 'pose.bones["%s"].scale' % source_bone.name
-        fc_root_loc = [action.fcurves.find(fcurve_name, index=i) for i in range(3)]
-        return VectorFCurvesEvaluator(FCurvesEvaluator(fc_root_loc, default_value=(1.0, 1.0, 1.0)))
+        return create_scale_evaluator(action, source_bone)
 
     def _bake_action(self, context, *source_bones):
         action = context.object.animation_data.action
@@ -215,6 +338,7 @@ class BakingOperator(object):
             if obj is not context.object:
                 obj.select_set(state=False)
 
+        import bpy_extras.anim_utils
         baked_action = bpy_extras.anim_utils.bake_action(
             context.object,
             action=None,
@@ -256,13 +380,14 @@ class ANIM_OT_carWheelsRotationBake(bpy.types.Operator, BakingOperator):
     @cursor('WAIT')
     def _bake_wheels_rotation(self, context):
         bones = context.object.data.bones
+        roles = get_roles(context.object)
 
         wheel_bones = []
         brake_bones = []
         for position, side in itertools.product(('Ft', 'Bk'), ('L', 'R')):
-            for index, wheel_bone in enumerate(bone_range(bones, 'MCH-Wheel.rotation', position, side)):
+            for index, wheel_bone in bone_range(roles, bones, 'MCH-Wheel.rotation', position, side):
                 wheel_bones.append(wheel_bone)
-                brake_bones.append(find_wheelbrake_bone(bones, position, side, index) or wheel_bone)
+                brake_bones.append(find_wheelbrake_bone(roles, bones, position, side, index) or wheel_bone)
 
         for property_name in map(lambda wheel_bone: wheel_bone.name.replace('MCH-', ''), wheel_bones):
             clear_property_animation(context, property_name)
@@ -277,6 +402,7 @@ class ANIM_OT_carWheelsRotationBake(bpy.types.Operator, BakingOperator):
         try:
             for wheel_bone, brake_bone in zip(wheel_bones, brake_bones):
                 self._bake_wheel_rotation(context, baked_action, wheel_bone, brake_bone)
+            record_wheel_radii(context.object.animation_data.action, wheel_radii(context.object))
         finally:
             bpy.data.actions.remove(baked_action)
 
@@ -293,12 +419,8 @@ class ANIM_OT_carWheelsRotationBake(bpy.types.Operator, BakingOperator):
         yield self.frame_start, distance
         for f in range(self.frame_start + 1, self.frame_end):
             pos = loc_evaluator.evaluate(f)
-            speed_vector = pos - prev_pos
-            speed_vector *= 2 * brake_evaluator.evaluate(f).y - 1
-            rotation_quaternion = rot_evaluator.evaluate(f)
-            bone_orientation = rotation_quaternion @ bone_init_vector
-            speed = math.copysign(speed_vector.magnitude, bone_orientation.dot(speed_vector))
-            speed /= radius
+            bone_orientation = rot_evaluator.evaluate(f) @ bone_init_vector
+            speed = wheel_speed(pos, prev_pos, brake_evaluator.evaluate(f).y, bone_orientation, radius)
             drop_keyframe = False
             if speed == .0:
                 drop_keyframe = prev_speed == speed
@@ -324,6 +446,28 @@ class ANIM_OT_carWheelsRotationBake(bpy.types.Operator, BakingOperator):
             kf.type = 'JITTER'
 
 
+class ANIM_OT_carWheelsRotationRetarget(bpy.types.Operator):
+    bl_idname = 'anim.car_wheels_rotation_retarget'
+    bl_label = 'Retarget wheels rotation'
+    bl_description = 'Rescales the baked wheels rotation to the current size of the wheels, without baking again'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return (context.object is not None and context.object.data is not None and context.object.data.get('Car Rig') and
+                context.object.animation_data is not None and context.object.animation_data.action is not None)
+
+    def execute(self, context):
+        ob = context.object
+        action = ob.animation_data.action
+        if WHEEL_RADII_PROPERTY not in action:
+            self.report({'WARNING'}, 'The wheels rotation of %s was baked without its wheels size, bake it again' % action.name)
+            return {'CANCELLED'}
+        ob.animation_data.action, count = retarget_wheels_rotation(ob, action)
+        self.report({'INFO'}, '%d wheels rotation rescaled' % count)
+        return {'FINISHED'}
+
+
 class ANIM_OT_carSteeringBake(bpy.types.Operator, BakingOperator):
     bl_idname = 'anim.car_steering_bake'
     bl_label = 'Bake car steering'
@@ -433,11 +577,11 @@ class ANIM_OT_carClearSteeringWheelsRotation(bpy.types.Operator):
         return context.object is not None and context.object.data is not None and context.object.data.get('Car Rig')
 
     def execute(self, context):
-        re_wheel_propname = re.compile(r'^Wheel\.rotation\.(Ft|Bk)\.[LR](\.\d+)?$')
-        for prop in context.object.keys():
-            if prop == 'Steering.rotation':
-                clear_property_animation(context, prop, remove_keyframes=self.clear_steering)
-            elif re_wheel_propname.match(prop):
+        if 'Steering.rotation' in context.object:
+            clear_property_animation(context, 'Steering.rotation', remove_keyframes=self.clear_steering)
+        for bone_name in get_roles(context.object).names('MCH-Wheel.rotation'):
+            prop = bone_name.replace('MCH-', '', 1)
+            if prop in context.object:
                 clear_property_animation(context, prop, remove_keyframes=self.clear_wheels)
         # this is a hack to force Blender to take into account the modification
         # of the properties by changing the object mode.
@@ -448,15 +592,263 @@ class ANIM_OT_carClearSteeringWheelsRotation(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class RootMotion(object):
+    """
+    Transform of the Root bone read from the action, without evaluating the scene: either its location and rotation
+    FCurves or, when it follows a path with a fixed location, the animated offset along the path.
+    matrix(f) maps rest positions of the armature to their posed positions.
+    """
+
+    def __init__(self, ob):
+        root = ob.pose.bones['Root']
+        action = ob.animation_data.action if ob.animation_data is not None else None
+        self.root_rest = ob.data.bones['Root'].matrix_local.copy()
+        self.root_rest_inverted = self.root_rest.inverted()
+        self.sources = {action} if action is not None else set()
+
+        self.path = None
+        follow_path = next((c for c in root.constraints if c.type == 'FOLLOW_PATH' and not c.mute and c.target is not None), None)
+        if follow_path is not None and follow_path.use_fixed_location and follow_path.target.type == 'CURVE':
+            self._init_path(ob, action, follow_path)
+            return
+
+        self.loc_evaluator = create_location_evaluator(action, root)
+        if root.rotation_mode == 'QUATERNION':
+            self.rot_evaluator = create_quaternion_evaluator(action, root)
+        else:
+            self.rot_evaluator = create_euler_evaluator(action, root)
+
+    def _init_path(self, ob, action, follow_path):
+        import numpy as np
+        path = follow_path.target
+        self.sources.update((path, path.data))
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        path_eval = path.evaluated_get(depsgraph)
+        mesh = path_eval.to_mesh()
+        try:
+            co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+            mesh.vertices.foreach_get('co', co)
+        finally:
+            path_eval.to_mesh_clear()
+        # the polyline of the path in the space of the armature
+        matrix = np.asarray(ob.matrix_world.inverted() @ path.matrix_world, dtype=np.float64)
+        self.path = co.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+        self.path_length = np.concatenate(([0], np.cumsum(np.linalg.norm(np.diff(self.path, axis=0), axis=1))))
+        fcurve = action.fcurves.find('pose.bones["Root"].constraints["%s"].offset_factor' % follow_path.name) if action else None
+        self.offset_evaluator = FCurvesEvaluator([fcurve], default_value=(follow_path.offset_factor,))
+
+    def matrix(self, f):
+        import numpy as np
+        if self.path is None:
+            pose = mathutils.Matrix.Translation(self.loc_evaluator.evaluate(f)) @ self.rot_evaluator.evaluate(f).to_matrix().to_4x4()
+            return self.root_rest @ pose @ self.root_rest_inverted
+
+        if len(self.path) < 2:
+            return mathutils.Matrix.Identity(4)
+        distance = min(max(self.offset_evaluator.evaluate(f)[0], 0), 1) * self.path_length[-1]
+        i = min(int(np.searchsorted(self.path_length, distance, side='right')), len(self.path) - 1)
+        a, b = self.path[i - 1], self.path[i]
+        t = (distance - self.path_length[i - 1]) / max(self.path_length[i] - self.path_length[i - 1], 1e-9)
+        position = mathutils.Vector(a + t * (b - a))
+        # the car moves towards -Y
+        rotation = mathutils.Vector((0, -1, 0)).rotation_difference(mathutils.Vector(b - a)).to_matrix().to_4x4()
+        return mathutils.Matrix.Translation(position) @ rotation @ mathutils.Matrix.Translation(-self.root_rest.translation)
+
+
+def animation_sources(ob):
+    """The actions animating a rig, its active one and the ones of its NLA strips, in evaluation order."""
+    if ob.animation_data is None:
+        return ()
+    actions = [strip.action for track in ob.animation_data.nla_tracks if not track.mute
+               for strip in track.strips if not strip.mute and strip.action is not None]
+    if ob.animation_data.action is not None:
+        actions.append(ob.animation_data.action)
+    return tuple(actions)
+
+
+def animation_signature(ob):
+    """Identity and timing of the actions animating a rig, compared at each frame change to catch a reassignment."""
+    if ob.animation_data is None:
+        return ()
+    strips = tuple((strip.action.as_pointer(), strip.frame_start, strip.frame_end, strip.scale, strip.repeat)
+                   for track in ob.animation_data.nla_tracks if not track.mute
+                   for strip in track.strips if not strip.mute and strip.action is not None)
+    action = ob.animation_data.action
+    return strips, action.as_pointer() if action is not None else 0
+
+
+class WheelDistances(object):
+    """
+    Distance covered by the wheels of a rig, computed frame after frame with the same math as the wheels rotation bake.
+    The state is kept every interval frames so that going to any frame costs at most interval steps,
+    and playing forward costs a single step per frame.
+    """
+
+    def __init__(self, ob, frame_start, interval):
+        self.frame_start = frame_start
+        self.interval = max(1, interval)
+        self.motion = RootMotion(ob)
+        self.signature = animation_signature(ob)
+        self.sources = self.motion.sources | set(animation_sources(ob))
+        action = ob.animation_data.action if ob.animation_data is not None else None
+
+        roles = get_roles(ob)
+        bones = ob.data.bones
+        self.wheels = []
+        for position, side in itertools.product(('Ft', 'Bk'), ('L', 'R')):
+            for index, bone in bone_range(roles, bones, 'MCH-Wheel.rotation', position, side):
+                brake_bone = find_wheelbrake_bone(roles, bones, position, side, index)
+                brake_evaluator = create_scale_evaluator(action, brake_bone) if brake_bone is not None else None
+                self.wheels.append((bone.name.replace('MCH-', ''), bone.head_local.copy(),
+                                    (bone.head_local - bone.tail_local).normalized(),
+                                    bone.length if bone.length > .0 else 1.0, brake_evaluator))
+
+        matrix = self.motion.matrix(frame_start)
+        start_state = (tuple(0. for _ in self.wheels), tuple(matrix @ head for _, head, _, _, _ in self.wheels))
+        self.checkpoints = {frame_start: start_state}
+        self.last = (frame_start, start_state)
+
+    @property
+    def property_names(self):
+        return [wheel[0] for wheel in self.wheels]
+
+    def _step(self, state, f):
+        distances, positions = state
+        matrix = self.motion.matrix(f)
+        rotation = matrix.to_3x3()
+        new_distances = []
+        new_positions = []
+        for (_, head, init_vector, radius, brake_evaluator), distance, prev_pos in zip(self.wheels, distances, positions):
+            pos = matrix @ head
+            brake = brake_evaluator.evaluate(f).y if brake_evaluator is not None else 1.
+            new_distances.append(distance + wheel_speed(pos, prev_pos, brake, rotation @ init_vector, radius))
+            new_positions.append(pos)
+        return tuple(new_distances), tuple(new_positions)
+
+    def distances(self, f):
+        if f <= self.frame_start:
+            return self.checkpoints[self.frame_start][0]
+        frame, state = self.last
+        if not frame <= f <= frame + self.interval:
+            frame = max(k for k in self.checkpoints if k <= f)
+            state = self.checkpoints[frame]
+        while frame < f:
+            frame += 1
+            state = self._step(state, frame)
+            if (frame - self.frame_start) % self.interval == 0:
+                self.checkpoints[frame] = state
+        self.last = (frame, state)
+        return state[0]
+
+
+wheel_distances = {}
+
+
+def is_wheels_rotation_live(ob):
+    return ob.get(WHEELS_ROTATION_LIVE_PROPERTY) and ob.type == 'ARMATURE' and 'Root' in ob.pose.bones
+
+
+@persistent
+def update_live_wheels_rotation(scene, depsgraph=None):
+    for ob in scene.objects:
+        if not is_wheels_rotation_live(ob):
+            continue
+        distances = wheel_distances.get(ob.name)
+        if distances is None or distances.frame_start != scene.frame_start or distances.signature != animation_signature(ob):
+            distances = wheel_distances[ob.name] = WheelDistances(ob, scene.frame_start, ob[WHEELS_ROTATION_LIVE_PROPERTY])
+        for property_name, distance in zip(distances.property_names, distances.distances(scene.frame_current)):
+            ob[property_name] = distance
+        # the drivers reading the properties are evaluated again
+        ob.update_tag()
+
+
+@persistent
+def invalidate_wheel_distances(scene, depsgraph=None):
+    if not wheel_distances:
+        return
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+    updated = {update.id.original for update in depsgraph.updates}
+    for name in [name for name, distances in wheel_distances.items() if distances.sources & updated]:
+        del wheel_distances[name]
+
+
+@persistent
+def clear_wheel_distances(dummy):
+    wheel_distances.clear()
+
+
+class ANIM_OT_carWheelsRotationLive(bpy.types.Operator):
+    bl_idname = 'anim.car_wheels_rotation_live'
+    bl_label = 'Live wheels rotation'
+    bl_description = 'Turns the wheels at each frame change from the Root bone animation, without baking'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    interval: bpy.props.IntProperty(name='Checkpoint interval', description='Number of frames between two stored states of the wheels',
+                                    min=1, default=25)
+
+    @classmethod
+    def poll(cls, context):
+        return (context.object is not None and context.object.data is not None and context.object.data.get('Car Rig') and
+                'Root' in context.object.pose.bones)
+
+    def execute(self, context):
+        ob = context.object
+        for bone_name in get_roles(ob).names('MCH-Wheel.rotation'):
+            clear_property_animation(context, bone_name.replace('MCH-', '', 1))
+        if WHEELS_ON_Y_AXIS_LIVE_PROPERTY not in ob:
+            ob[WHEELS_ON_Y_AXIS_LIVE_PROPERTY] = ob.get('wheels_on_y_axis', False)
+        ob['wheels_on_y_axis'] = False
+        ob[WHEELS_ROTATION_LIVE_PROPERTY] = self.interval
+        wheel_distances.pop(ob.name, None)
+        update_live_wheels_rotation(context.scene)
+        return {'FINISHED'}
+
+
+class ANIM_OT_carWheelsRotationLiveStop(bpy.types.Operator):
+    bl_idname = 'anim.car_wheels_rotation_live_stop'
+    bl_label = 'Stop live wheels rotation'
+    bl_description = 'Stops turning the wheels at each frame change'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.get(WHEELS_ROTATION_LIVE_PROPERTY)
+
+    def execute(self, context):
+        ob = context.object
+        del ob[WHEELS_ROTATION_LIVE_PROPERTY]
+        if WHEELS_ON_Y_AXIS_LIVE_PROPERTY in ob:
+            ob['wheels_on_y_axis'] = ob[WHEELS_ON_Y_AXIS_LIVE_PROPERTY]
+            del ob[WHEELS_ON_Y_AXIS_LIVE_PROPERTY]
+        wheel_distances.pop(ob.name, None)
+        for bone_name in get_roles(ob).names('MCH-Wheel.rotation'):
+            clear_property_animation(context, bone_name.replace('MCH-', '', 1), remove_keyframes=False)
+        return {'FINISHED'}
+
+
 def register():
     bpy.utils.register_class(ANIM_OT_carWheelsRotationBake)
+    bpy.utils.register_class(ANIM_OT_carWheelsRotationRetarget)
     bpy.utils.register_class(ANIM_OT_carSteeringBake)
     bpy.utils.register_class(ANIM_OT_carClearSteeringWheelsRotation)
+    bpy.utils.register_class(ANIM_OT_carWheelsRotationLive)
+    bpy.utils.register_class(ANIM_OT_carWheelsRotationLiveStop)
+    bpy.app.handlers.frame_change_pre.append(update_live_wheels_rotation)
+    bpy.app.handlers.depsgraph_update_post.append(invalidate_wheel_distances)
+    bpy.app.handlers.load_post.append(clear_wheel_distances)
 
 
 def unregister():
+    bpy.app.handlers.load_post.remove(clear_wheel_distances)
+    bpy.app.handlers.depsgraph_update_post.remove(invalidate_wheel_distances)
+    bpy.app.handlers.frame_change_pre.remove(update_live_wheels_rotation)
+    wheel_distances.clear()
+    bpy.utils.unregister_class(ANIM_OT_carWheelsRotationLiveStop)
+    bpy.utils.unregister_class(ANIM_OT_carWheelsRotationLive)
     bpy.utils.unregister_class(ANIM_OT_carClearSteeringWheelsRotation)
     bpy.utils.unregister_class(ANIM_OT_carSteeringBake)
+    bpy.utils.unregister_class(ANIM_OT_carWheelsRotationRetarget)
     bpy.utils.unregister_class(ANIM_OT_carWheelsRotationBake)
 
 
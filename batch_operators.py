@@ -0,0 +1,208 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import bpy
+import time
+from . import car_rig
+from . import widgets
+
+
+class RigReport(object):
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.rig = None
+        self.seconds = .0
+        self.error = None
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+    def __str__(self):
+        if self.failed:
+            return '%s: failed after %.2fs (%s)' % (self.prefix or '<no prefix>', self.seconds, self.error)
+        return '%s: %s generated in %.2fs' % (self.prefix or '<no prefix>', self.rig.name, self.seconds)
+
+
+def is_rigged(obj):
+    return obj.parent is not None and obj.parent.type == 'ARMATURE' and 'Car Rig' in obj.parent.data
+
+
+def find_vehicles(objects):
+    """
+    Group the objects by vehicle. As for a single car (see OBJECT_OT_armatureCarDeformationRig._check_selection),
+    the prefix of a vehicle is the part of the body object name before 'body'.
+    Each object goes to the longest prefix starting its name. Vehicles already rigged are ignored.
+    A body without prefix (named just 'Body') gets no parts: every name would start with its empty prefix.
+    Return a dict {prefix: (body, parts)}.
+    """
+    candidates = [o for o in objects if o.type != 'ARMATURE' and not is_rigged(o)]
+    bodies = {}
+    for obj in candidates:
+        name_low = obj.name.lower()
+        if 'body' in name_low:
+            bodies.setdefault(name_low.split('body')[0], obj)
+
+    prefixes = sorted(filter(None, bodies), key=len, reverse=True)
+    vehicles = {prefix: (body, []) for prefix, body in bodies.items()}
+    for obj in candidates:
+        name_low = obj.name.lower()
+        prefix = next((p for p in prefixes if name_low.startswith(p)), None)
+        if prefix is not None:
+            vehicles[prefix][1].append(obj)
+    return vehicles
+
+
+def save_parents(objects):
+    return [(obj, obj.parent, obj.parent_type, obj.parent_bone, obj.matrix_world.copy()) for obj in objects]
+
+
+def discard_partial_rig(saved_parents, new_objects):
+    """Give back their parent to the parts of a vehicle whose rig failed and delete the objects created for it."""
+    for obj, parent, parent_type, parent_bone, matrix_world in saved_parents:
+        obj.parent = parent
+        obj.parent_type = parent_type
+        obj.parent_bone = parent_bone
+        obj.matrix_world = matrix_world
+    for obj in new_objects:
+        data = obj.data
+        bpy.data.objects.remove(obj)
+        if isinstance(data, bpy.types.Armature) and data.users == 0:
+            bpy.data.armatures.remove(data)
+
+
+def generate_rigs(context, objects=None, adjust_origin=True, lean_drivers=False):
+    """
+    Build the deformation rig and generate the animation rig for every vehicle found in objects
+    (the visible objects of the view layer by default). Return a list of RigReport, one per vehicle.
+    Can be called from a script in background mode.
+    """
+    if objects is None:
+        objects = context.visible_objects
+    vehicles = find_vehicles(objects)
+    reports = []
+
+    if context.object is not None and context.object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    selection = list(context.selected_objects)
+    active = context.view_layer.objects.active
+
+    # all the rigs share the same widgets: create them once instead of on the first missing shape of each rig
+    widgets.create()
+
+    try:
+        for prefix, (body, parts) in sorted(vehicles.items()):
+            report = RigReport(prefix)
+            reports.append(report)
+            if not prefix:
+                report.error = 'no prefix before "body" in %s to find the parts of the vehicle' % body.name
+                continue
+            start = time.perf_counter()
+            saved_parents = save_parents([body] + parts)
+            existing_objects = set(bpy.data.objects)
+            try:
+                for obj in context.selected_objects:
+                    obj.select_set(state=False)
+                for obj in parts:
+                    obj.select_set(state=True)
+                context.view_layer.objects.active = body
+
+                bpy.ops.object.armature_car_deformation_rig_v2('INVOKE_DEFAULT')
+                rig = body.parent
+                if rig is None or 'Car Rig' not in rig.data:
+                    raise RuntimeError('no deformation rig created')
+                report.rig = rig
+
+                context.view_layer.objects.active = rig
+                car_rig.ArmatureGenerator(rig).generate(context.scene, adjust_origin, lean_drivers)
+            except Exception as e:
+                report.error = str(e) or e.__class__.__name__
+                report.rig = None
+            finally:
+                if context.object is not None and context.object.mode != 'OBJECT':
+                    bpy.ops.object.mode_set(mode='OBJECT')
+                if report.failed:
+                    # the next vehicles must not find the parts of this one parented to a half built rig
+                    discard_partial_rig(saved_parents, [o for o in bpy.data.objects if o not in existing_objects])
+                report.seconds = time.perf_counter() - start
+    finally:
+        for obj in context.selected_objects:
+            obj.select_set(state=False)
+        for obj in selection:
+            obj.select_set(state=True)
+        context.view_layer.objects.active = active
+
+    return reports
+
+
+class OBJECT_OT_carBatchRigGenerate(bpy.types.Operator):
+    bl_idname = 'object.car_batch_rig_generate'
+    bl_label = 'Generate car rigs for all vehicles'
+    bl_description = 'Creates and generates a complete rig for each vehicle found by the name of its body'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    only_selected: bpy.props.BoolProperty(name='Only selected',
+                                          description='Look for vehicles in the selected objects only',
+                                          default=False)
+
+    adjust_origin: bpy.props.BoolProperty(name='Move origin',
+                                          description='Set origin of the armatures at the same location as root bone',
+                                          default=True)
+
+    lean_drivers: bpy.props.BoolProperty(name='Lean drivers',
+                                         description='Generate fewer drivers and constraints, without the wheels rotation along the Y axis of the root bone',
+                                         default=False)
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT'
+
+    def draw(self, context):
+        self.layout.use_property_split = True
+        self.layout.use_property_decorate = False
+        self.layout.prop(self, 'only_selected')
+        self.layout.prop(self, 'adjust_origin')
+        self.layout.prop(self, 'lean_drivers')
+
+    def execute(self, context):
+        objects = context.selected_objects if self.only_selected else context.visible_objects
+        start = time.perf_counter()
+        reports = generate_rigs(context, objects, self.adjust_origin, self.lean_drivers)
+        elapsed = time.perf_counter() - start
+
+        for report in reports:
+            self.report({'WARNING'} if report.failed else {'INFO'}, str(report))
+
+        nb_failed = sum(1 for r in reports if r.failed)
+        self.report({'INFO'}, '%d rigs generated, %d failed in %.2fs' % (len(reports) - nb_failed, nb_failed, elapsed))
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(OBJECT_OT_carBatchRigGenerate)
+
+
+def unregister():
+    bpy.utils.unregister_class(OBJECT_OT_carBatchRigGenerate)
+
+
+if __name__ == "__main__":
+    register()
@@ -0,0 +1,78 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+"""
+Compare the driver graph of the rigs generated with and without lean drivers on the vehicles of a blend file:
+
+    blender -b blender-test/basic-model.blend --python blender-test/benchmark_drivers.py -- [repeat]
+
+The file is reverted between the two generations.
+"""
+
+import collections
+import importlib
+import os
+import sys
+import time
+import bpy
+
+addon_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+addon_name = os.path.basename(addon_directory)
+sys.path.insert(0, os.path.dirname(addon_directory))
+addon = importlib.import_module(addon_name)
+batch_operators = importlib.import_module(addon_name + '.batch_operators')
+car_rig = importlib.import_module(addon_name + '.car_rig')
+
+argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+repeat = int(argv[0]) if argv else 20
+
+if addon_name not in bpy.context.preferences.addons:
+    addon.register()
+
+
+def measure(lean_drivers):
+    context = bpy.context
+    reports = batch_operators.generate_rigs(context, lean_drivers=lean_drivers)
+    rigs = [r.rig for r in reports if r.rig is not None]
+    totals = collections.Counter()
+    seconds = .0
+    for rig in rigs:
+        totals.update(car_rig.driver_statistics(rig))
+        seconds += car_rig.time_rig_evaluation(context, rig, repeat)
+
+    scene = context.scene
+    start = time.perf_counter()
+    for frame in range(scene.frame_start, scene.frame_start + repeat):
+        scene.frame_set(frame)
+    frame_seconds = (time.perf_counter() - start) / repeat
+    return len(rigs), totals, seconds, frame_seconds
+
+
+results = {}
+for lean_drivers in (False, True):
+    bpy.ops.wm.revert_mainfile()
+    results[lean_drivers] = measure(lean_drivers)
+
+print('%-22s %12s %12s' % ('', 'default', 'lean'))
+print('%-22s %12d %12d' % ('rigs', results[False][0], results[True][0]))
+for key in ('drivers', 'average', 'simple_expressions', 'python_expressions', 'modifiers', 'constraints'):
+    print('%-22s %12d %12d' % (key, results[False][1][key], results[True][1][key]))
+print('%-22s %10.2fms %10.2fms' % ('rigs evaluation', results[False][2] * 1000, results[True][2] * 1000))
+print('%-22s %10.2fms %10.2fms' % ('frame change', results[False][3] * 1000, results[True][3] * 1000))
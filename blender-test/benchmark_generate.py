@@ -0,0 +1,116 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+"""
+Timing breakdown of the rig generation on the vehicles of a blend file:
+
+    blender -b blender-test/basic-model.blend --python blender-test/benchmark_generate.py -- [repeat]
+
+The phases of ArmatureGenerator are timed over all the generated rigs, then the bulk writes of the bones are compared to the equivalent per-bone writes.
+"""
+
+import collections
+import functools
+import importlib
+import os
+import sys
+import time
+import bpy
+
+addon_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+addon_name = os.path.basename(addon_directory)
+sys.path.insert(0, os.path.dirname(addon_directory))
+addon = importlib.import_module(addon_name)
+batch_operators = importlib.import_module(addon_name + '.batch_operators')
+car_rig = importlib.import_module(addon_name + '.car_rig')
+
+argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+repeat = int(argv[0]) if argv else 20
+timings = collections.defaultdict(float)
+
+
+def timed(owner, name):
+    function = getattr(owner, name)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timings[name] += time.perf_counter() - start
+    setattr(owner, name, wrapper)
+
+
+for name in ('generate', 'generate_animation_rig', 'generate_pose_rig', 'generate_constraints_on_rig',
+             'generate_bone_groups', 'generate_physics_rig'):
+    timed(car_rig.ArmatureGenerator, name)
+for name in ('deselect_edit_bones', 'dispatch_bones_to_armature_layers', 'lock_pose_bones'):
+    timed(car_rig, name)
+
+if addon_name not in bpy.context.preferences.addons:
+    addon.register()
+reports = batch_operators.generate_rigs(bpy.context)
+rigs = [r.rig for r in reports if r.rig is not None]
+print('%d rigs, %d bones' % (len(rigs), sum(len(rig.data.bones) for rig in rigs)))
+for report in reports:
+    if report.error:
+        print('  %s: %s' % (report.prefix, report.error))
+for name, seconds in sorted(timings.items(), key=lambda t: -t[1]):
+    print('%-36s %8.2fms' % (name, seconds * 1000))
+
+
+def per_bone_layers(ob):
+    for b in ob.data.bones:
+        layers = [False] * 32
+        layers[car_rig.MCH_BONE_LAYER] = True
+        b.layers = layers
+
+
+def bulk_layers(ob):
+    layers = [False] * (len(ob.data.bones) * 32)
+    layers[car_rig.MCH_BONE_LAYER::32] = [True] * len(ob.data.bones)
+    ob.data.bones.foreach_set('layers', layers)
+
+
+def per_bone_locks(ob):
+    for b in ob.pose.bones:
+        b.lock_location = (True, True, True)
+        b.lock_rotation = (True, True, True)
+        b.lock_scale = (True, True, True)
+        b.lock_rotation_w = True
+
+
+def bulk_locks(ob):
+    car_rig.lock_pose_bones(ob.pose.bones, ob.pose.bones.keys())
+
+
+def measure(function):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for rig in rigs:
+            function(rig)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+if rigs:
+    print('per generation:              per bone       bulk')
+    print('layers                     %8.2fms %8.2fms' % (measure(per_bone_layers), measure(bulk_layers)))
+    print('locks                      %8.2fms %8.2fms' % (measure(per_bone_locks), measure(bulk_locks)))
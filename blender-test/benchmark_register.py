@@ -0,0 +1,72 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+"""
+Measure the cost of loading the add-on in a background Blender session:
+
+    blender -b --factory-startup --python blender-test/benchmark_register.py -- [repeat]
+
+The import and the first register() are measured once in a fresh interpreter,
+then register()/unregister() cycles are repeated.
+"""
+
+import importlib
+import os
+import sys
+import time
+
+addon_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+addon_name = os.path.basename(addon_directory)
+sys.path.insert(0, os.path.dirname(addon_directory))
+
+argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+repeat = int(argv[0]) if argv else 20
+heavy_modules = ('numpy', 'bpy_extras.anim_utils', 'bpy_extras.object_utils', 'rna_prop_ui')
+already_loaded = {name for name in heavy_modules if name in sys.modules}
+
+start = time.perf_counter()
+addon = importlib.import_module(addon_name)
+import_time = time.perf_counter() - start
+
+start = time.perf_counter()
+addon.register()
+register_time = time.perf_counter() - start
+
+start = time.perf_counter()
+addon.unregister()
+unregister_time = time.perf_counter() - start
+
+cycles = []
+for _ in range(repeat):
+    start = time.perf_counter()
+    addon.register()
+    addon.unregister()
+    cycles.append(time.perf_counter() - start)
+
+print('import        %8.2fms' % (import_time * 1000))
+print('register      %8.2fms' % (register_time * 1000))
+print('unregister    %8.2fms' % (unregister_time * 1000))
+print('cycle (x%d)   %8.2fms median' % (repeat, sorted(cycles)[len(cycles) // 2] * 1000))
+for name in heavy_modules:
+    if name in already_loaded:
+        state = 'loaded by Blender'
+    else:
+        state = 'loaded by the add-on' if name in sys.modules else 'not loaded'
+    print('%-22s %s' % (name, state))
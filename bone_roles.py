@@ -0,0 +1,100 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import re
+
+ROLES_PROPERTY = 'Car Rig Roles'
+NO_SLOT = '-'
+POSITIONS = ('Ft', 'Bk')
+SIDES = ('L', 'R')
+
+RE_ROLE_BONE_NAME = re.compile(r'^(?P<role>.+?)(?:\.(?P<position>Ft|Bk)(?:\.(?P<side>[LR]))?(?:\.(?P<index>\d{3}))?)?$')
+
+
+def parse_bone_name(name):
+    """
+    Split a bone name into its role, position, side and index.
+    'MCH-Wheel.rotation.Bk.R.002' gives ('MCH-Wheel.rotation', 'Bk', 'R', 2)
+    and 'GroundSensor.Axle.Ft' gives ('GroundSensor.Axle', 'Ft', None, 0).
+    """
+    matcher = RE_ROLE_BONE_NAME.match(name)
+    return matcher.group('role'), matcher.group('position'), matcher.group('side'), int(matcher.group('index') or 0)
+
+
+def slot_key(position=None, side=None):
+    return '.'.join(filter(None, (position, side))) or NO_SLOT
+
+
+def build_roles(bone_names):
+    """
+    Return {role: {slot: [bone names ordered by index]}}, a slot being 'Ft.L', 'Ft' or NO_SLOT.
+    Missing indices are kept as empty names so that the list position is the index.
+    """
+    roles = {}
+    for name in bone_names:
+        role, position, side, index = parse_bone_name(name)
+        names = roles.setdefault(role, {}).setdefault(slot_key(position, side), [])
+        if len(names) <= index:
+            names.extend([''] * (index + 1 - len(names)))
+        names[index] = name
+    return roles
+
+
+def write_roles(armature, bone_names):
+    """Store the role index of the bones as an ID property of the armature data."""
+    armature[ROLES_PROPERTY] = build_roles(bone_names)
+
+
+class BoneRoles(object):
+    """Read access to the role index of a car rig."""
+
+    def __init__(self, roles):
+        self.roles = roles
+
+    @classmethod
+    def from_armature(cls, armature):
+        roles = armature.get(ROLES_PROPERTY)
+        if roles is not None:
+            return cls(roles.to_dict())
+        # rig generated by an older version: index the bones without storing the result
+        return cls(build_roles(armature.bones.keys()))
+
+    def name(self, role, position=None, side=None, index=0):
+        names = self.roles.get(role, {}).get(slot_key(position, side), ())
+        return names[index] or None if index < len(names) else None
+
+    def indexed(self, role, position=None, side=None):
+        for index, name in enumerate(self.roles.get(role, {}).get(slot_key(position, side), ())):
+            if name:
+                yield index, name
+
+    def names(self, role, position=None, side=None):
+        """
+        Yield the bone names of a role. Without position (or side) every position (or side)
+        is enumerated, front before back and left before right.
+        """
+        for p in (position,) if position is not None else (None,) + POSITIONS:
+            for s in (side,) if side is not None else (None,) + SIDES:
+                for _, name in self.indexed(role, p, s):
+                    yield name
+
+
+def get_roles(ob):
+    return BoneRoles.from_armature(ob.data)
@@ -20,29 +20,51 @@
 
 import bpy
 import math
-import bpy_extras
+import itertools
 import mathutils
 import re
+import time
 from math import inf
-from rna_prop_ui import rna_idprop_ui_create
 from mathutils import Matrix, Vector
+from .bone_roles import POSITIONS, SIDES, build_roles, get_roles, parse_bone_name, slot_key, write_roles
 
 CUSTOM_SHAPE_LAYER = 13
 MCH_BONE_EXTENSION_LAYER = 14
 DEF_BONE_LAYER = 15
 MCH_BONE_LAYER = 31
 
+def set_flags(collection, attribute, size, indices, value):
+    """
+    Set the boolean array attribute of the items of collection at the given indices to value (a sequence of size),
+    with a single foreach_get/foreach_set round trip instead of one RNA write per item.
+    """
+    flags = [False] * (len(collection) * size)
+    collection.foreach_get(attribute, flags)
+    value = list(value)
+    for i in indices:
+        flags[i * size:(i + 1) * size] = value
+    collection.foreach_set(attribute, flags)
+
+
 def deselect_edit_bones(ob):
-    for b in ob.data.edit_bones:
-        b.select = False
-        b.select_head = False
-        b.select_tail = False
+    edit_bones = ob.data.edit_bones
+    unselected = [False] * len(edit_bones)
+    for attribute in ('select', 'select_head', 'select_tail'):
+        edit_bones.foreach_set(attribute, unselected)
+
+
+def lock_pose_bones(pose_bones, names):
+    """Lock the location, rotation and scale of the pose bones of the given names."""
+    names = set(names)
+    indices = [i for i, name in enumerate(pose_bones.keys()) if name in names]
+    for attribute in ('lock_location', 'lock_rotation', 'lock_scale'):
+        set_flags(pose_bones, attribute, 3, indices, (True, True, True))
+    set_flags(pose_bones, 'lock_rotation_w', 1, indices, (True,))
 
 
 def create_constraint_influence_driver(ob, cns, driver_data_path, base_influence=1.0):
     fcurve = cns.driver_add('influence')
     drv = fcurve.driver
-    drv.type = 'AVERAGE'
     var = drv.variables.new()
     var.name = 'influence'
     var.type = 'SINGLE_PROP'
@@ -53,10 +75,13 @@ def create_constraint_influence_driver(ob, cns, driver_data_path, base_influence
     targ.data_path = driver_data_path
 
     if base_influence != 1.0:
-        fmod = fcurve.modifiers[0]
-        fmod.mode = 'POLYNOMIAL'
-        fmod.poly_order = 1
-        fmod.coefficients = (0, base_influence)
+        # a simple expression is evaluated without Python, and cheaper than a generator modifier on the driver
+        drv.type = 'SCRIPTED'
+        drv.expression = 'influence * %r' % base_influence
+    else:
+        drv.type = 'AVERAGE'
+    for fmod in list(fcurve.modifiers):
+        fcurve.modifiers.remove(fmod)
 
 
 def create_constraint_generic_driver(ob, cns, driver_data_path, property_name):
@@ -119,7 +144,7 @@ def create_translation_x_driver(ob, bone, driver_data_path):
 
 
 def create_bone_group(pose, group_name, color_set, bone_names):
-    group = pose.bone_groups.new(name=group_name)
+    group = pose.bone_groups.get(group_name) or pose.bone_groups.new(name=group_name)
     group.color_set = color_set
     for bone_name in bone_names:
         bone = pose.bones.get(bone_name)
@@ -134,41 +159,97 @@ def name_range(prefix, nb=1000):
             yield '%s.%03d' % (prefix, i)
 
 
+RE_VEHICLE_PART_NAME = re.compile(r'(wheelbrake|wheel)\.(ft|bk)\.([lr])(?:\.(\d{3}))?', re.IGNORECASE)
+
+
+def index_bone_names(names, base_name):
+    """
+    Group names like 'DEF-Wheel.Ft.L.002' by (position, side) in a single pass.
+    Each group lists the names ordered by index, stopping at the first missing index as name_range does.
+    """
+    slots = build_roles(names).get(base_name, {})
+    return {(position, side): list(itertools.takewhile(None, slots.get(slot_key(position, side), ())))
+            for position, side in itertools.product(POSITIONS, SIDES)}
+
+
+def index_vehicle_objects(objects):
+    """
+    Map the wheel and wheel brake objects to the name of their bone (without the DEF- prefix),
+    e.g. 'truck_wheel.bk.l.003' -> 'Wheel.Bk.L.003'. The first object found for a name wins.
+    """
+    indexed = {}
+    for obj in objects:
+        matcher = RE_VEHICLE_PART_NAME.search(obj.name)
+        if matcher is None:
+            continue
+        part, position, side, index = matcher.groups()
+        name = '%s.%s.%s' % ('WheelBrake' if part.lower() == 'wheelbrake' else 'Wheel',
+                             'Ft' if position.lower() == 'ft' else 'Bk',
+                             side.upper())
+        if index is not None and int(index) > 0:
+            name = '%s.%03d' % (name, int(index))
+        indexed.setdefault(name, obj)
+    return indexed
+
+
+def count_indexed_pairs(indexed, base_name, position):
+    return max(sum(1 for _ in itertools.takewhile(lambda n: n in indexed, name_range('%s.%s.%s' % (base_name, position, side))))
+               for side in ('L', 'R'))
+
+
 def get_widget(name):
-    widget = bpy.data.objects.get(name)
-    if widget is None:
+    from . import widgets
+    # import widgets
 
-        from . import widgets
-        # import widgets
+    return widgets.get(name)
+
+
+def find_physics_object(rig):
+    for c in rig.children:
+        if any(m.type == 'SOFT_BODY' for m in c.modifiers):
+            return c
 
-        widgets.create()
-        widget = bpy.data.objects.get(name)
-    return widget
+
+def find_proxy_object(rig):
+    for c in rig.children:
+        if 'proxy' in c.name.lower():
+            return c
 
 
 def define_custom_property(target, name, value, description=None, overridable=True):
+    from rna_prop_ui import rna_idprop_ui_create
     rna_idprop_ui_create(target, name, default=value, description=description, overridable=overridable, min=-inf, max=inf)
 
 
 def dispatch_bones_to_armature_layers(ob):
-    re_mch_bone = re.compile(r'^MCH-Wheel(Brake)?\.(Ft|Bk)\.[LR](\.\d+)?$')
+    roles = get_roles(ob)
+    mch_extension_bones = {'MCH-Body', 'MCH-Steering'}
+    mch_extension_bones.update(roles.names('MCH-Wheel'))
+    mch_extension_bones.update(roles.names('MCH-WheelBrake'))
     default_visible_layers = [False] * 32
 
-    for b in ob.data.bones:
-        layers = [False] * 32
-        if b.name.startswith('DEF-'):
-            layers[DEF_BONE_LAYER] = True
-        elif b.name.startswith('MCH-'):
-            layers[MCH_BONE_LAYER] = True
-            if b.name in ('MCH-Body', 'MCH-Steering') or re_mch_bone.match(b.name):
-                layers[MCH_BONE_EXTENSION_LAYER] = True
+    bones = ob.data.bones
+    bone_names = bones.keys()
+    bone_indices = {name: i for i, name in enumerate(bone_names)}
+    bone_group_indices = [0] * len(ob.pose.bones)
+    ob.pose.bones.foreach_get('bone_group_index', bone_group_indices)
+    bone_group_indices = dict(zip(ob.pose.bones.keys(), bone_group_indices))
+
+    # the layers of all the bones, 32 flags per bone, written at once
+    layers = [False] * (len(bone_names) * 32)
+    for i, name in enumerate(bone_names):
+        offset = i * 32
+        if name.startswith('DEF-'):
+            layers[offset + DEF_BONE_LAYER] = True
+        elif name.startswith('MCH-'):
+            layers[offset + MCH_BONE_LAYER] = True
+            if name in mch_extension_bones:
+                layers[offset + MCH_BONE_EXTENSION_LAYER] = True
         else:
-            layer_num = ob.pose.bones[b.name].bone_group_index
-            layers[layer_num] = True
+            # a bone without group (index -1) goes to the last layer, as indexing its own layer list did
+            layer_num = bone_group_indices[name] % 32
+            layers[offset + layer_num] = True
             default_visible_layers[layer_num] = True
-        b.layers = layers
-
-    ob.data.layers = default_visible_layers
 
     shape_bone_layers = [False] * 32
     shape_bone_layers[CUSTOM_SHAPE_LAYER] = True
@@ -176,9 +257,13 @@ def dispatch_bones_to_armature_layers(ob):
         if b.custom_shape:
             if b.custom_shape_transform:
                 ob.pose.bones[b.custom_shape_transform.name].custom_shape = b.custom_shape
-                ob.data.bones[b.custom_shape_transform.name].layers = shape_bone_layers
+                offset = bone_indices[b.custom_shape_transform.name] * 32
+                layers[offset:offset + 32] = shape_bone_layers
             else:
-                ob.data.bones[b.name].layers[CUSTOM_SHAPE_LAYER] = True
+                layers[bone_indices[b.name] * 32 + CUSTOM_SHAPE_LAYER] = True
+
+    bones.foreach_set('layers', layers)
+    ob.data.layers = default_visible_layers
 
 
 class NameSuffix(object):
@@ -299,16 +384,13 @@ class WheelBoundingBox(BoundingBox):
 
 class WheelsDimension(object):
 
-    def __init__(self, armature, position, side_position, default):
+    def __init__(self, armature, position, side_position, default, wheel_names=None):
         self.default = default
         self.position = position
         self.side_position = side_position
-        self.wheels = []
-        wheel_bones = (armature.data.edit_bones.get(name) for name in name_range('DEF-Wheel.%s.%s' % (self.position, self.side_position)))
-        for wheel_bone in wheel_bones:
-            if wheel_bone is None:
-                break
-            self.wheels.append(WheelBoundingBox(armature, wheel_bone.name, side_position))
+        if wheel_names is None:
+            wheel_names = index_bone_names(armature.data.edit_bones.keys(), 'DEF-Wheel').get((position, side_position), ())
+        self.wheels = [WheelBoundingBox(armature, name, side_position) for name in wheel_names]
 
     def name_suffixes(self):
         for i in range(len(self.wheels)):
@@ -371,10 +453,11 @@ class CarDimension(object):
     def __init__(self, armature):
         body = armature.data.edit_bones['DEF-Body']
         self.bb_body = BoundingBox(armature, 'DEF-Body')
-        self.wheels_front_left = WheelsDimension(armature, 'Ft', 'L', default=body.head)
-        self.wheels_front_right = WheelsDimension(armature, 'Ft', 'R', default=body.head)
-        self.wheels_back_left = WheelsDimension(armature, 'Bk', 'L', default=body.tail)
-        self.wheels_back_right = WheelsDimension(armature, 'Bk', 'R', default=body.tail)
+        wheel_names = index_bone_names(armature.data.edit_bones.keys(), 'DEF-Wheel')
+        self.wheels_front_left = WheelsDimension(armature, 'Ft', 'L', body.head, wheel_names.get(('Ft', 'L'), ()))
+        self.wheels_front_right = WheelsDimension(armature, 'Ft', 'R', body.head, wheel_names.get(('Ft', 'R'), ()))
+        self.wheels_back_left = WheelsDimension(armature, 'Bk', 'L', body.tail, wheel_names.get(('Bk', 'L'), ()))
+        self.wheels_back_right = WheelsDimension(armature, 'Bk', 'R', body.tail, wheel_names.get(('Bk', 'R'), ()))
 
     @property
     def body_center(self):
@@ -455,6 +538,115 @@ class CarDimension(object):
         return filter(lambda w: w.nb, (self.wheels_front_left, self.wheels_front_right, self.wheels_back_left, self.wheels_back_right))
 
 
+SNAPSHOT_PROPERTY = 'Car Rig Snapshot'
+LEAN_DRIVERS_PROPERTY = 'Car Rig Lean Drivers'
+WHEEL_BONE_BASE_NAMES = ('GroundSensor', 'SHP-GroundSensor', 'MCH-Wheel', 'MCH-Wheel.rotation', 'MCH-WheelBrake', 'Wheel', 'WheelBrake')
+WHEEL_DAMPER_BASE_NAMES = ('WheelDamper', 'MCH-WheelDamper', 'MCH-GroundSensor')
+
+
+def driver_statistics(ob):
+    """Count the drivers of a rig: total, by type of evaluation and with modifiers, and its bone constraints."""
+    statistics = dict(drivers=0, average=0, simple_expressions=0, python_expressions=0, modifiers=0,
+                      constraints=sum(len(b.constraints) for b in ob.pose.bones))
+    if ob.animation_data is None:
+        return statistics
+    for fcurve in ob.animation_data.drivers:
+        drv = fcurve.driver
+        statistics['drivers'] += 1
+        if drv.type != 'SCRIPTED':
+            statistics['average'] += 1
+        elif drv.is_simple_expression:
+            statistics['simple_expressions'] += 1
+        else:
+            statistics['python_expressions'] += 1
+        if len(fcurve.modifiers):
+            statistics['modifiers'] += 1
+    return statistics
+
+
+def time_rig_evaluation(context, ob, repeat=20):
+    """Average time in seconds to evaluate the animation, drivers and constraints of a rig."""
+    context.view_layer.update()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        ob.update_tag(refresh={'OBJECT', 'DATA', 'TIME'})
+        context.view_layer.update()
+    return (time.perf_counter() - start) / repeat
+
+
+def take_snapshot(ob):
+    """
+    Describe what the animation rig is generated from: the DEF bones and the dimensions of the objects they carry.
+    Moving the rig or its origin does not change the snapshot.
+    """
+    children = {}
+    for child in ob.children:
+        if child.parent_type == 'BONE':
+            children.setdefault(child.parent_bone, []).append(child)
+    snapshot = {}
+    for b in ob.data.bones:
+        if b.name.startswith('DEF-'):
+            values = list(b.head_local) + list(b.tail_local)
+            for child in children.get(b.name, ()):
+                values += list(child.dimensions)
+            snapshot[b.name] = values
+    return snapshot
+
+
+def same_values(values, other_values, tolerance=1e-5):
+    return len(values) == len(other_values) and all(abs(a - b) <= tolerance for a, b in zip(values, other_values))
+
+
+def diff_snapshots(previous, current):
+    changed = set(previous.keys() ^ current.keys())
+    changed.update(name for name in previous.keys() & current.keys() if not same_values(previous[name], current[name]))
+    return changed
+
+
+def changed_wheel_suffixes(previous, current, changed):
+    """
+    Return the name suffixes of the wheels to rebuild when the changes are local to some wheels:
+    a wheel whose size changed without moving or a brake added, removed or moved.
+    Return None when the whole rig depends on the changes.
+    """
+    name_suffixes = {}
+    for name in changed:
+        if not name.startswith('DEF-'):
+            return None
+        role, position, side, index = parse_bone_name(name[len('DEF-'):])
+        if position is None or side is None:
+            return None
+        name_suffix = NameSuffix(position, side, index)
+        wheel_name = name_suffix.name('DEF-Wheel')
+        if wheel_name not in previous or wheel_name not in current:
+            return None
+        if role == 'Wheel':
+            if not same_values(previous[name][:6], current[name][:6]):
+                return None
+        elif role != 'WheelBrake':
+            return None
+        name_suffixes[name_suffix.value] = name_suffix
+    return list(name_suffixes.values())
+
+
+def make_armature_single_user(ob):
+    """
+    Give the rig its own armature before editing its bones. Rigs instantiated from a template share the armature
+    of the template: editing the bones of one would break the constraints and drivers of the others.
+    """
+    # the armature of a stored template has a fake user which is not an instance
+    if ob.data.users - ob.data.use_fake_user > 1:
+        ob.data = ob.data.copy()
+
+
+def remove_bone_drivers(ob, bone_names):
+    if ob.animation_data is None:
+        return
+    data_paths = tuple('pose.bones["%s"]' % name for name in bone_names)
+    for fcurve in [fc for fc in ob.animation_data.drivers if fc.data_path.startswith(data_paths)]:
+        ob.animation_data.drivers.remove(fcurve)
+
+
 def create_wheel_brake_bone(wheel_brake, parent_bone, wheel_bone):
     wheel_brake.use_deform = False
     wheel_brake.parent = parent_bone
@@ -495,7 +687,16 @@ class ArmatureGenerator(object):
     def __init__(self, ob):
         self.ob = ob
 
-    def generate(self, scene, adjust_origin):
+    @property
+    def lean_drivers(self):
+        """Generate the rig without the drivers of the features hidden from the UI (wheels rotation along Y axis)."""
+        return bool(self.ob.data.get(LEAN_DRIVERS_PROPERTY, False))
+
+    def generate(self, scene, adjust_origin, lean_drivers=False):
+        from . import widgets
+        widgets.resolve()
+        self.ob.data[LEAN_DRIVERS_PROPERTY] = lean_drivers
+
         define_custom_property(self.ob,
                                name='wheels_on_y_axis',
                                value=False,
@@ -516,26 +717,26 @@ class ArmatureGenerator(object):
                                name='wheel_offset',
                                value=(0.0, 0.0, 0.0),
                                description="Wheel offset")
-        # define_custom_property(self.ob,
-        #                        name='sb_mass',
-        #                        value=.25,
-        #                        description="The mass of the vehicle in the physics simulation")
-        # define_custom_property(self.ob,
-        #                        name='sb_friction',
-        #                        value=4.0,
-        #                        description="Friction of the physics simulation")
-        # define_custom_property(self.ob,
-        #                        name='sb_stiffness',
-        #                        value=0.05,
-        #                        description="Stiffness of the physics simulation")
-        # define_custom_property(self.ob,
-        #                        name='sb_roll',
-        #                        value=1.0,
-        #                        description="The effect of physics simulation on roll")
-        # define_custom_property(self.ob,
-        #                        name='sb_pitch',
-        #                        value=0.25,
-        #                        description="The effect of physics simulation on pitch")
+        define_custom_property(self.ob,
+                               name='sb_mass',
+                               value=.25,
+                               description="The mass of the vehicle in the physics simulation")
+        define_custom_property(self.ob,
+                               name='sb_friction',
+                               value=4.0,
+                               description="Friction of the physics simulation")
+        define_custom_property(self.ob,
+                               name='sb_stiffness',
+                               value=0.05,
+                               description="Stiffness of the physics simulation")
+        define_custom_property(self.ob,
+                               name='sb_roll',
+                               value=1.0,
+                               description="The effect of physics simulation on roll")
+        define_custom_property(self.ob,
+                               name='sb_pitch',
+                               value=0.25,
+                               description="The effect of physics simulation on pitch")
 
         # DONE add parameters
         # REJECTED add button to bake and clear softbody cache
@@ -573,6 +774,7 @@ class ArmatureGenerator(object):
             bpy.ops.object.mode_set(mode='EDIT')
             self.dimension = CarDimension(self.ob)
             self.generate_animation_rig()
+            write_roles(self.ob.data, self.ob.data.edit_bones.keys())
             self.ob.data['Car Rig'] = True
             deselect_edit_bones(self.ob)
 
@@ -581,16 +783,142 @@ class ArmatureGenerator(object):
                 self.set_origin(scene)
 
             bpy.ops.object.mode_set(mode='POSE')
-            self.generate_constraints_on_rig()
-            self.ob.display_type = 'WIRE'
+            self.generate_pose_rig()
+            self.ob.data[SNAPSHOT_PROPERTY] = take_snapshot(self.ob)
+
+        finally:
+            self.ob.location += location
 
-            self.generate_bone_groups()
-            dispatch_bones_to_armature_layers(self.ob)
-            self.generate_physics_rig()
-            self.position_proxy()
+    def generate_pose_rig(self):
+        self.generate_constraints_on_rig()
+        self.ob.display_type = 'WIRE'
+
+        self.generate_bone_groups()
+        dispatch_bones_to_armature_layers(self.ob)
+        self.generate_physics_rig()
+        self.position_proxy()
+
+    def regenerate(self):
+        """
+        Rebuild the parts of the rig depending on the DEF bones changed since the last generation.
+        Actions and baked animation are kept. Return the names of the changed DEF bones.
+        """
+        previous = self.ob.data.get(SNAPSHOT_PROPERTY)
+        current = take_snapshot(self.ob)
+        if previous is not None:
+            previous = previous.to_dict()
+            changed = diff_snapshots(previous, current)
+            name_suffixes = changed_wheel_suffixes(previous, current, changed)
+        else:
+            changed = set(current)
+            name_suffixes = None
+        if not changed:
+            return changed
 
+        from . import widgets
+        widgets.resolve()
+        make_armature_single_user(self.ob)
+
+        location = self.ob.location.copy()
+        self.ob.location = (0, 0, 0)
+        try:
+            if name_suffixes is None:
+                self.regenerate_all()
+            else:
+                self.regenerate_wheels(name_suffixes)
+            self.ob.data[SNAPSHOT_PROPERTY] = take_snapshot(self.ob)
         finally:
             self.ob.location += location
+        return changed
+
+    def regenerate_wheels(self, name_suffixes):
+        ob = self.ob
+        amt = ob.data
+        values = {s.value for s in name_suffixes}
+        sides = {(s.position, s.side) for s in name_suffixes}
+        # brakes added with POSE_OT_carAnimationAddBrakeWheelBones are not created by the generator
+        added_brakes = [s for s in name_suffixes if s.name('WheelBrake') in amt.bones and not (s.is_left and s.is_first)]
+        bone_names = [s.name(base_name) for s in name_suffixes for base_name in WHEEL_BONE_BASE_NAMES]
+        bone_names += ['%s.%s.%s' % (base_name, position, side) for position, side in sides for base_name in WHEEL_DAMPER_BASE_NAMES]
+        remove_bone_drivers(ob, bone_names)
+        # the deformation bones are kept, their constraints are generated again
+        for name in (s.name(base_name) for s in name_suffixes for base_name in ('DEF-Wheel', 'DEF-WheelBrake')):
+            pose_bone = ob.pose.bones.get(name)
+            if pose_bone is not None:
+                for cns in list(pose_bone.constraints):
+                    pose_bone.constraints.remove(cns)
+
+        bpy.ops.object.mode_set(mode='EDIT')
+        for name in bone_names:
+            edit_bone = amt.edit_bones.get(name)
+            if edit_bone is not None:
+                amt.edit_bones.remove(edit_bone)
+        self.dimension = CarDimension(ob)
+        wheel_dimensions = [w for w in self.dimension.wheels_dimensions if (w.position, w.side_position) in sides]
+        base_bone_parent = amt.edit_bones.get('MCH-Root.Axle.Bk') or amt.edit_bones['Drift']
+        for wheel_dimension in wheel_dimensions:
+            for name_suffix, wheel_bounding_box in zip(wheel_dimension.name_suffixes(), wheel_dimension.wheels):
+                if name_suffix.value in values:
+                    self.generate_animation_wheel_bones(name_suffix, wheel_bounding_box, base_bone_parent)
+            self.generate_wheel_damper(wheel_dimension, base_bone_parent)
+        for name_suffix in added_brakes:
+            create_wheel_brake_bone(amt.edit_bones.new(name_suffix.name('WheelBrake')),
+                                    amt.edit_bones[name_suffix.name('MCH-Wheel')],
+                                    amt.edit_bones[name_suffix.name('Wheel')])
+        write_roles(amt, amt.edit_bones.keys())
+        deselect_edit_bones(ob)
+
+        bpy.ops.object.mode_set(mode='POSE')
+        for wheel_dimension in wheel_dimensions:
+            for name_suffix in wheel_dimension.name_suffixes():
+                if name_suffix.value in values:
+                    self.generate_constraints_on_wheel_bones(name_suffix)
+            self.generate_constraints_on_wheel_damper(wheel_dimension)
+        for name_suffix in added_brakes:
+            generate_constraint_on_wheel_brake_bone(ob.pose.bones[name_suffix.name('WheelBrake')], ob.pose.bones[name_suffix.name('Wheel')])
+        self.generate_bone_groups()
+        dispatch_bones_to_armature_layers(ob)
+
+    def regenerate_all(self):
+        ob = self.ob
+        amt = ob.data
+        physics = find_physics_object(ob)
+        saved_properties = {k: v.to_list() if hasattr(v, 'to_list') else v for k, v in ob.items() if not hasattr(v, 'to_dict')}
+        saved_targets = {}
+        for pose_bone in ob.pose.bones:
+            for cns in pose_bone.constraints:
+                target = getattr(cns, 'target', None)
+                if target is not None and target not in (ob, physics):
+                    saved_targets[(pose_bone.name, cns.name)] = target
+            if pose_bone.name.startswith('DEF-'):
+                for cns in list(pose_bone.constraints):
+                    pose_bone.constraints.remove(cns)
+        if physics is not None:
+            for cns in list(physics.constraints):
+                physics.constraints.remove(cns)
+        remove_bone_drivers(ob, amt.bones.keys())
+        for bone_group in list(ob.pose.bone_groups):
+            ob.pose.bone_groups.remove(bone_group)
+
+        bpy.ops.object.mode_set(mode='EDIT')
+        for edit_bone in [b for b in amt.edit_bones if not b.name.startswith('DEF-')]:
+            amt.edit_bones.remove(edit_bone)
+        self.dimension = CarDimension(ob)
+        self.generate_animation_rig()
+        write_roles(amt, amt.edit_bones.keys())
+        deselect_edit_bones(ob)
+
+        bpy.ops.object.mode_set(mode='POSE')
+        self.generate_pose_rig()
+
+        for (bone_name, cns_name), target in saved_targets.items():
+            pose_bone = ob.pose.bones.get(bone_name)
+            cns = pose_bone.constraints.get(cns_name) if pose_bone is not None else None
+            if cns is not None:
+                cns.target = target
+        for name, value in saved_properties.items():
+            if name in ob:
+                ob[name] = value
 
     def generate_animation_rig(self):
 
@@ -856,12 +1184,7 @@ class ArmatureGenerator(object):
     def generate_constraints_on_rig(self):
         pose = self.ob.pose
 
-        for b in pose.bones:
-            if b.name.startswith('DEF-') or b.name.startswith('MCH-') or b.name.startswith('SHP-'):
-                b.lock_location = (True, True, True)
-                b.lock_rotation = (True, True, True)
-                b.lock_scale = (True, True, True)
-                b.lock_rotation_w = True
+        lock_pose_bones(pose.bones, [name for name in pose.bones.keys() if name.startswith(('DEF-', 'MCH-', 'SHP-'))])
 
         for wheel_dimension in self.dimension.wheels_dimensions:
             for name_suffix in wheel_dimension.name_suffixes():
@@ -1201,22 +1524,23 @@ class ArmatureGenerator(object):
         cns.owner_space = 'POSE'
         cns.target_space = 'POSE'
 
-        cns = mch_wheel.constraints.new('TRANSFORM')
-        cns.name = 'Wheel rotation along Y axis'
-        cns.target = self.ob
-        cns.subtarget = 'Root'
-        cns.use_motion_extrapolate = True
-        cns.map_from = 'LOCATION'
-        cns.from_min_y = - math.pi * abs(mch_wheel.head.z if mch_wheel.head.z != 0 else 1)
-        cns.from_max_y = - cns.from_min_y
-        cns.map_to_x_from = 'Y'
-        cns.map_to = 'ROTATION'
-        cns.to_min_x_rot = math.pi
-        cns.to_max_x_rot = -math.pi
-        cns.owner_space = 'LOCAL'
-        cns.target_space = 'LOCAL'
+        if not self.lean_drivers:
+            cns = mch_wheel.constraints.new('TRANSFORM')
+            cns.name = 'Wheel rotation along Y axis'
+            cns.target = self.ob
+            cns.subtarget = 'Root'
+            cns.use_motion_extrapolate = True
+            cns.map_from = 'LOCATION'
+            cns.from_min_y = - math.pi * abs(mch_wheel.head.z if mch_wheel.head.z != 0 else 1)
+            cns.from_max_y = - cns.from_min_y
+            cns.map_to_x_from = 'Y'
+            cns.map_to = 'ROTATION'
+            cns.to_min_x_rot = math.pi
+            cns.to_max_x_rot = -math.pi
+            cns.owner_space = 'LOCAL'
+            cns.target_space = 'LOCAL'
 
-        create_constraint_influence_driver(self.ob, cns, '["wheels_on_y_axis"]')
+            create_constraint_influence_driver(self.ob, cns, '["wheels_on_y_axis"]')
 
         cns = mch_wheel.constraints.new('COPY_ROTATION')
         cns.name = 'Animation wheels'
@@ -1290,11 +1614,7 @@ class ArmatureGenerator(object):
         create_bone_group(pose, 'GroundSensor', color_set='THEME02', bone_names=ground_sensor_names)
 
     def generate_physics_rig(self):
-
-        for c in self.ob.children:
-            for m in c.modifiers:
-                if m.type == "SOFT_BODY":
-                    sb_physics_obj = c
+        sb_physics_obj = find_physics_object(self.ob)
 
         # connection of suspension ctrl
         susp_ctrl = self.ob.pose.bones.get("Suspension")
@@ -1337,30 +1657,15 @@ class ArmatureGenerator(object):
         tmp_constr.space_subtarget = "Root"
         # create_constraint_influence_driver(self.ob, tmp_constr, '["sb_pitch"]')
 
-        # creation of 4 location constraints to follow wheels
-        tmp_constr = sb_physics_obj.constraints.new("COPY_LOCATION")
-        tmp_constr.target = self.ob
-        tmp_constr.subtarget = "GroundSensor.Ft.L"
-        tmp_constr.use_z = False
-        tmp_constr.influence = 1
-
-        tmp_constr = sb_physics_obj.constraints.new("COPY_LOCATION")
-        tmp_constr.target = self.ob
-        tmp_constr.subtarget = "GroundSensor.Ft.R"
-        tmp_constr.use_z = False
-        tmp_constr.influence = 0.333333
-
-        tmp_constr = sb_physics_obj.constraints.new("COPY_LOCATION")
-        tmp_constr.target = self.ob
-        tmp_constr.subtarget = "GroundSensor.Bk.L"
-        tmp_constr.use_z = False
-        tmp_constr.influence = 0.333333
-
-        tmp_constr = sb_physics_obj.constraints.new("COPY_LOCATION")
-        tmp_constr.target = self.ob
-        tmp_constr.subtarget = "GroundSensor.Bk.R"
-        tmp_constr.use_z = False
-        tmp_constr.influence = 0.333333
+        # the mass follows the middle of the wheelbase: whatever the number of axles, the goal is
+        # the running average of the axle ground sensors so the fan-in stays at two constraints
+        axle_sensors = [name for name in ('GroundSensor.Axle.Ft', 'GroundSensor.Axle.Bk') if name in self.ob.pose.bones]
+        for i, axle_sensor in enumerate(axle_sensors):
+            tmp_constr = sb_physics_obj.constraints.new("COPY_LOCATION")
+            tmp_constr.target = self.ob
+            tmp_constr.subtarget = axle_sensor
+            tmp_constr.use_z = False
+            tmp_constr.influence = 1 / (i + 1)
 
         sb_physics_obj.location = [0, 0, 0]
         susp_ctrl_w_loc = self.ob.location + susp_ctrl.head
@@ -1368,11 +1673,7 @@ class ArmatureGenerator(object):
 
 
     def position_proxy(self):
-
-        for c in self.ob.children:
-            if "proxy" in c.name.lower():
-                proxy_obj = c
-
+        proxy_obj = find_proxy_object(self.ob)
         def_body_location = self.ob.pose.bones.get("DEF-Body").head
         proxy_obj.location = def_body_location
 
@@ -1485,27 +1786,15 @@ class OBJECT_OT_armatureCarDeformationRig(bpy.types.Operator):
             print("no body found")
             return self.execute(context)
 
-        self._find_generic_obj(context, 'Wheel.Ft.L')
-        self._find_generic_obj(context, 'Wheel.Ft.R')
-        self._find_generic_obj(context, 'Wheel.Bk.L')
-        self._find_generic_obj(context, 'Wheel.Bk.R')
-
-        self._find_generic_obj(context, 'WheelBrake.Ft.L')
-        self._find_generic_obj(context, 'WheelBrake.Ft.R')
-        self._find_generic_obj(context, 'WheelBrake.Bk.L')
-        self._find_generic_obj(context, 'WheelBrake.Bk.R')
-
-        # TODO: this is needed for multiple rear/front wheels. cool!
-        # self.nb_front_wheels_pairs = max(nb_wheels_ft_l, nb_wheels_ft_r)
-        # self.nb_back_wheels_pairs = max(nb_wheels_bk_l, nb_wheels_bk_r)
-        # self.nb_front_wheel_brakes_pairs = max(nb_wheel_brakes_ft_l, nb_wheel_brakes_ft_r)
-        # self.nb_back_wheel_brakes_pairs = max(nb_wheel_brakes_bk_l, nb_wheel_brakes_bk_r)
+        # a single pass over the selection finds every wheel and brake, whatever the number of axles
+        for name, obj in index_vehicle_objects(context.selected_objects).items():
+            self.target_objects[name] = obj
+            self.bones_position[name] = obj.location.copy()
 
-        # enforcing 2 axles
-        self.nb_front_wheels_pairs = 1
-        self.nb_back_wheels_pairs = 1
-        self.nb_front_wheel_brakes_pairs = 1
-        self.nb_back_wheel_brakes_pairs = 1
+        self.nb_front_wheels_pairs = max(1, count_indexed_pairs(self.target_objects, 'Wheel', 'Ft'))
+        self.nb_back_wheels_pairs = max(1, count_indexed_pairs(self.target_objects, 'Wheel', 'Bk'))
+        self.nb_front_wheel_brakes_pairs = max(1, count_indexed_pairs(self.target_objects, 'WheelBrake', 'Ft'))
+        self.nb_back_wheel_brakes_pairs = max(1, count_indexed_pairs(self.target_objects, 'WheelBrake', 'Bk'))
 
         def move_origin(target_obj, location):
             mat = Matrix.Translation(location - target_obj.location)
@@ -1533,25 +1822,12 @@ class OBJECT_OT_armatureCarDeformationRig(bpy.types.Operator):
 
         # tweak brakes origin so that they are centered on wheels (needed for cambering)
         # TODO this creates issues with instances - they move around. You need to add a camber bone, just admit it.
-        obj = self.target_objects["WheelBrake.Ft.L"]
-        target_position = self.target_objects["Wheel.Ft.L"].location.copy()
-        move_origin(obj, target_position)
-        self.bones_position["WheelBrake.Ft.L"] = obj.location.copy()
-
-        obj = self.target_objects["WheelBrake.Ft.R"]
-        target_position = self.target_objects["Wheel.Ft.R"].location.copy()
-        move_origin(obj, target_position)
-        self.bones_position["WheelBrake.Ft.R"] = obj.location.copy()
-
-        obj = self.target_objects["WheelBrake.Bk.L"]
-        target_position = self.target_objects["Wheel.Bk.L"].location.copy()
-        move_origin(obj, target_position)
-        self.bones_position["WheelBrake.Bk.L"] = obj.location.copy()
-
-        obj = self.target_objects["WheelBrake.Bk.R"]
-        target_position = self.target_objects["Wheel.Bk.R"].location.copy()
-        move_origin(obj, target_position)
-        self.bones_position["WheelBrake.Bk.R"] = obj.location.copy()
+        for name, obj in list(self.target_objects.items()):
+            if name.startswith('WheelBrake.'):
+                wheel_obj = self.target_objects.get(name.replace('WheelBrake.', 'Wheel.', 1))
+                if wheel_obj is not None:
+                    move_origin(obj, wheel_obj.location.copy())
+                    self.bones_position[name] = obj.location.copy()
 
         # ORIGINAL CODE
         # has_body_target = self._find_target_object(context, 'Body')
@@ -1666,6 +1942,7 @@ class OBJECT_OT_armatureCarDeformationRig(bpy.types.Operator):
         amt['Car Rig'] = False
 
         res, prefix = self._check_selection(context)
+        import bpy_extras.object_utils
         rig = bpy_extras.object_utils.object_data_add(context, amt, name=f'{prefix}-car-rig')
 
         # TODO: cannot edit new object added to a hidden collection
@@ -1786,6 +2063,10 @@ class POSE_OT_carAnimationRigGenerate(bpy.types.Operator):
                                           description='Set origin of the armature at the same location as root bone',
                                           default=True)
 
+    lean_drivers: bpy.props.BoolProperty(name='Lean drivers',
+                                         description='Generate fewer drivers and constraints, without the wheels rotation along the Y axis of the root bone',
+                                         default=False)
+
     @classmethod
     def poll(cls, context):
         return context.object is not None and context.object.data is not None and 'Car Rig' in context.object.data
@@ -1794,10 +2075,11 @@ class POSE_OT_carAnimationRigGenerate(bpy.types.Operator):
         self.layout.use_property_split = True
         self.layout.use_property_decorate = False
         self.layout.prop(self, 'adjust_origin')
+        self.layout.prop(self, 'lean_drivers')
 
     def execute(self, context):
         if context.object.data['Car Rig']:
-            self.report({'INFO'}, 'Rig already generated')
+            self.report({'INFO'}, 'Rig already generated, use Regenerate to update it')
             return {"CANCELLED"}
 
         if 'DEF-Body' not in context.object.data.bones:
@@ -1805,7 +2087,49 @@ class POSE_OT_carAnimationRigGenerate(bpy.types.Operator):
             return {"CANCELLED"}
 
         armature_generator = ArmatureGenerator(context.object)
-        armature_generator.generate(context.scene, self.adjust_origin)
+        armature_generator.generate(context.scene, self.adjust_origin, self.lean_drivers)
+        return {"FINISHED"}
+
+
+class POSE_OT_carAnimationRigRegenerate(bpy.types.Operator):
+    bl_idname = "pose.car_animation_rig_regenerate"
+    bl_label = "Regenerate car animation rig"
+    bl_description = "Updates the generated rig after the deformation bones or the wheels changed, keeping the animation"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.data is not None and context.object.data.get('Car Rig') and\
+               context.object.mode in ('POSE', 'OBJECT')
+
+    def execute(self, context):
+        mode = context.object.mode
+        changed = ArmatureGenerator(context.object).regenerate()
+        bpy.ops.object.mode_set(mode=mode)
+        if changed:
+            self.report({'INFO'}, 'Rig updated for %s' % ', '.join(sorted(changed)))
+        else:
+            self.report({'INFO'}, 'Rig already up to date')
+        return {"FINISHED"}
+
+
+class POSE_OT_carDriverReport(bpy.types.Operator):
+    bl_idname = "pose.car_driver_report"
+    bl_label = "Report drivers"
+    bl_description = "Counts the drivers and constraints of the rig and measures its evaluation time"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.data is not None and context.object.data.get('Car Rig')
+
+    def execute(self, context):
+        statistics = driver_statistics(context.object)
+        seconds = time_rig_evaluation(context, context.object)
+        self.report({'INFO'}, '%(drivers)d drivers (%(average)d average, %(simple_expressions)d simple expressions, '
+                              '%(python_expressions)d python expressions, %(modifiers)d with modifiers), '
+                              '%(constraints)d constraints' % statistics +
+                              ', evaluated in %.2fms' % (seconds * 1000))
         return {"FINISHED"}
 
 
@@ -1823,35 +2147,51 @@ class POSE_OT_carAnimationAddBrakeWheelBones(bpy.types.Operator):
 
     def execute(self, context):
         mode = context.object.mode
+        amt = context.object.data
         re_wheel_bone_name = re.compile(r'^Wheel\.(Ft|Bk)\.([LR])(\.\d+)?$')
+        brakes = []
         for pose_bone in context.selected_pose_bones:
             matcher = re_wheel_bone_name.match(pose_bone.name)
             if matcher:
                 wheelbrake_name = 'WheelBrake.%s.%s%s' % matcher.groups(default='')
                 parent_name = 'MCH-Wheel.%s.%s%s' % matcher.groups(default='')
-                self.create_wheelbrake_bone(context, pose_bone, wheelbrake_name, parent_name)
-        bpy.ops.object.mode_set(mode=mode)
+                if wheelbrake_name not in amt.bones and parent_name in amt.bones:
+                    brakes.append((wheelbrake_name, parent_name, pose_bone.name))
+        if brakes:
+            self.create_wheelbrake_bones(context, brakes)
+            bpy.ops.object.mode_set(mode=mode)
         return {"FINISHED"}
 
-    def create_wheelbrake_bone(self, context, wheel_pose_bone, name, parent_name):
+    def create_wheelbrake_bones(self, context, brakes):
+        """
+        Create the brake bones given as (name, parent name, wheel name), all the edit bones in a single
+        edit session then all the pose bones in a single pose session.
+        """
         obj = context.object
-        amt = context.object.data
-        if name not in amt.bones and parent_name in amt.bones:
-            bpy.ops.object.mode_set(mode='EDIT')
-            create_wheel_brake_bone(amt.edit_bones.new(name), amt.edit_bones[parent_name], amt.edit_bones[wheel_pose_bone.name])
-            bpy.ops.object.mode_set(mode='POSE')
-            generate_constraint_on_wheel_brake_bone(obj.pose.bones[name], wheel_pose_bone)
+        make_armature_single_user(obj)
+        amt = obj.data
+        bpy.ops.object.mode_set(mode='EDIT')
+        for name, parent_name, wheel_name in brakes:
+            create_wheel_brake_bone(amt.edit_bones.new(name), amt.edit_bones[parent_name], amt.edit_bones[wheel_name])
+        write_roles(amt, amt.edit_bones.keys())
+        bpy.ops.object.mode_set(mode='POSE')
+        for name, parent_name, wheel_name in brakes:
+            generate_constraint_on_wheel_brake_bone(obj.pose.bones[name], obj.pose.bones[wheel_name])
 
 
 def register():
     bpy.utils.register_class(POSE_OT_carAnimationRigGenerate)
+    bpy.utils.register_class(POSE_OT_carAnimationRigRegenerate)
     bpy.utils.register_class(OBJECT_OT_armatureCarDeformationRig)
     bpy.utils.register_class(POSE_OT_carAnimationAddBrakeWheelBones)
+    bpy.utils.register_class(POSE_OT_carDriverReport)
 
 
 def unregister():
+    bpy.utils.unregister_class(POSE_OT_carDriverReport)
     bpy.utils.unregister_class(POSE_OT_carAnimationAddBrakeWheelBones)
     bpy.utils.unregister_class(OBJECT_OT_armatureCarDeformationRig)
+    bpy.utils.unregister_class(POSE_OT_carAnimationRigRegenerate)
     bpy.utils.unregister_class(POSE_OT_carAnimationRigGenerate)
 
 
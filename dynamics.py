@@ -0,0 +1,136 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+"""
+Secondary motion of the car body, computed without Blender so it can be run and checked anywhere.
+
+The body is a point mass attached to a goal (the middle of the axles) by a damped spring,
+like the single vertex of the soft body it replaces. The solver works on the offset of the mass
+from its goal: only the acceleration of the goal excites it.
+"""
+
+import numpy as np
+
+# the scales bring the parameters of the soft body (sb_mass, sb_stiffness and sb_friction custom
+# properties) to a body oscillating at about 1.5Hz with a damping ratio of about .3 for the defaults
+STIFFNESS_SCALE = 400.
+FRICTION_SCALE = .35
+
+
+def goal_acceleration(goal, fps):
+    """Acceleration of the goal trajectories (frames, ...) by central differences, zero at both ends."""
+    acceleration = np.zeros_like(goal, dtype=np.float64)
+    if len(goal) > 2:
+        acceleration[1:-1] = (goal[2:] - 2 * goal[1:-1] + goal[:-2]) * (fps * fps)
+    return acceleration
+
+
+def simulate(goal, mass, stiffness, friction, fps, substeps=4):
+    """
+    Offsets of the masses from their goals, an array shaped as goal (frames, cars, 3).
+    mass, stiffness and friction are scalars or arrays broadcastable to (cars,).
+    All the cars are stepped together with a semi-implicit Euler integration.
+    """
+    goal = np.asarray(goal, dtype=np.float64)
+    acceleration = goal_acceleration(goal, fps)
+    mass = np.maximum(np.asarray(mass, dtype=np.float64), 1e-6)[..., None]
+    spring = np.asarray(stiffness, dtype=np.float64)[..., None] * STIFFNESS_SCALE / mass
+    damping = np.asarray(friction, dtype=np.float64)[..., None] * FRICTION_SCALE / mass
+
+    dt = 1. / (fps * substeps)
+    offset = np.zeros(goal.shape[1:])
+    velocity = np.zeros(goal.shape[1:])
+    offsets = np.empty_like(goal)
+    for frame in range(len(goal)):
+        for _ in range(substeps):
+            velocity -= dt * (spring * offset + damping * velocity + acceleration[frame])
+            offset += dt * velocity
+        offsets[frame] = offset
+    return offsets
+
+
+def rotation(matrices):
+    """Rotation part of matrices (..., 4, 4), without their scale."""
+    matrices = np.asarray(matrices, dtype=np.float64)[..., :3, :3]
+    return matrices / np.linalg.norm(matrices, axis=-2, keepdims=True)
+
+
+def to_local(vectors, matrices):
+    """Express world vectors (..., 3) in the axes of world matrices (..., 4, 4), ignoring their scale."""
+    return np.einsum('...ji,...j->...i', rotation(matrices), vectors)
+
+
+def to_world(vectors, matrices):
+    """Inverse of to_local."""
+    return np.einsum('...ij,...j->...i', rotation(matrices), vectors)
+
+
+def to_pose_location(vectors, matrices):
+    """Pose location moving by world vectors (..., 3) bones whose world matrices (..., 4, 4) have no location."""
+    return np.linalg.solve(np.asarray(matrices, dtype=np.float64)[..., :3, :3], vectors[..., None])[..., 0]
+
+
+def reduce_keyframes(frames, values, tolerance):
+    """
+    Indices of the samples to keep so that the linear interpolation of the kept samples stays within tolerance
+    of all the values (Ramer-Douglas-Peucker on the vertical error). values is (frames,) or (frames, channels):
+    a sample is kept if any channel needs it.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64).reshape(len(frames), -1)
+    if len(frames) < 3:
+        return np.arange(len(frames))
+    keep = np.zeros(len(frames), dtype=bool)
+    keep[[0, -1]] = True
+    segments = [(0, len(frames) - 1)]
+    while segments:
+        first, last = segments.pop()
+        if last - first < 2:
+            continue
+        t = ((frames[first + 1:last] - frames[first]) / (frames[last] - frames[first]))[:, None]
+        interpolated = values[first] + t * (values[last] - values[first])
+        errors = np.abs(values[first + 1:last] - interpolated).max(axis=1)
+        worst = int(errors.argmax())
+        if errors[worst] > tolerance:
+            middle = first + 1 + worst
+            keep[middle] = True
+            segments.append((first, middle))
+            segments.append((middle, last))
+    return np.flatnonzero(keep)
+
+
+def body_attitude(axles, body_y, pitch_factor, roll_factor, roll_influences=(1, .5)):
+    """
+    Pitch, roll and heave (frames,) of the body from its axles. axles holds one (y, left z, left x, right z, right x)
+    per axle, front first, y and x being the rest location of the wheels and z their height offset (frames,).
+    As for the constraints of the rig, the front of the car is towards -Y and its left towards +X.
+    """
+    heights = [(left_z + right_z) / 2 for _, left_z, _, right_z, _ in axles]
+    rolls = [np.arctan2(left_z - right_z, left_x - right_x) for _, left_z, left_x, right_z, right_x in axles]
+    if len(axles) > 1:
+        (front_y, *_), (back_y, *_) = axles[0], axles[-1]
+        pitch = -np.arctan2(pitch_factor * (heights[0] - heights[-1]), back_y - front_y)
+        t = (body_y - front_y) / (back_y - front_y)
+        heave = pitch_factor * (heights[0] + t * (heights[-1] - heights[0]))
+    else:
+        pitch = np.zeros_like(heights[0])
+        heave = pitch_factor * heights[0]
+    roll = -roll_factor * sum(r * influence for r, influence in zip(rolls, roll_influences))
+    return pitch, roll, heave
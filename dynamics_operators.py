@@ -0,0 +1,555 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import bpy
+import hashlib
+import os
+import re
+import tempfile
+import time
+from bpy.app.handlers import persistent
+from .bake_operators import BakingOperator, cursor, sample_bone_matrices, write_fcurve_samples
+from .car_rig import find_physics_object
+
+DYNAMICS_PROPERTY = 'dynamics_engine'
+AXLE_SENSORS = ('GroundSensor.Axle.Ft', 'GroundSensor.Axle.Bk')
+SUSPENSION_LOCATION = 'pose.bones["Suspension"].location'
+DYNAMICS_CACHE_PROPERTY = 'dynamics_cache'
+DYNAMICS_CACHE_FRAME_START_PROPERTY = 'dynamics_cache_frame_start'
+DYNAMICS_CACHE_SUBSTEPS_PROPERTY = 'dynamics_cache_substeps'
+PHYSICS_FROZEN_PROPERTY = 'physics_frozen'
+# action holding the Suspension location keys of the animator while the dynamics are baked or frozen
+SUSPENSION_KEYS_PROPERTY = 'suspension_keys'
+SUSPENSION_KEY_ATTRIBUTES = ('co', 'handle_left_type', 'handle_right_type', 'handle_left', 'handle_right',
+                             'interpolation', 'easing', 'type')
+
+
+def physics_constraints(ob):
+    """The constraints connecting the Suspension bone to the soft body."""
+    physics = find_physics_object(ob)
+    suspension = ob.pose.bones.get('Suspension')
+    if physics is None or suspension is None:
+        return []
+    return [c for c in suspension.constraints if c.type == 'COPY_LOCATION' and c.target == physics]
+
+
+def dynamics_parameters(ob):
+    """mass, stiffness, friction and the (x, y, z) influence of the body motion on the Suspension bone."""
+    influence = (ob.get('sb_roll', 1.), .2 * ob.get('sb_pitch', .25), .5)
+    return ob.get('sb_mass', .25), ob.get('sb_stiffness', .05), ob.get('sb_friction', 4.), influence
+
+
+def is_dynamics_rig(ob):
+    return ob.type == 'ARMATURE' and ob.data.get('Car Rig') and 'Suspension' in ob.pose.bones
+
+
+def ensure_action(ob):
+    if ob.animation_data is None:
+        ob.animation_data_create()
+    if ob.animation_data.action is None:
+        ob.animation_data.action = bpy.data.actions.new("%sAction" % ob.name)
+    return ob.animation_data.action
+
+
+def copy_fcurves(source, target, data_path, action_group=''):
+    """Replace the FCurves of target animating data_path by copies of the ones of source, key by key."""
+    for i in range(3):
+        fcurve = target.fcurves.find(data_path, index=i)
+        if fcurve is not None:
+            target.fcurves.remove(fcurve)
+        fcurve = source.fcurves.find(data_path, index=i)
+        if fcurve is None:
+            continue
+        copy = target.fcurves.new(data_path, index=i, action_group=action_group)
+        copy.extrapolation = fcurve.extrapolation
+        copy.keyframe_points.add(len(fcurve.keyframe_points))
+        for key, copy_key in zip(fcurve.keyframe_points, copy.keyframe_points):
+            for name in SUSPENSION_KEY_ATTRIBUTES:
+                setattr(copy_key, name, getattr(key, name))
+        copy.update()
+
+
+def stash_suspension_keys(ob):
+    """
+    Keep the Suspension location keys of the animator in an action of their own before they are replaced by baked keys.
+    Return True if there were keys to keep.
+    """
+    action = ob.animation_data.action if ob.animation_data is not None else None
+    if SUSPENSION_KEYS_PROPERTY in ob or action is None or \
+            all(action.fcurves.find(SUSPENSION_LOCATION, index=i) is None for i in range(3)):
+        return False
+    stash = bpy.data.actions.new("%sSuspensionKeys" % ob.name)
+    copy_fcurves(action, stash, SUSPENSION_LOCATION)
+    ob[SUSPENSION_KEYS_PROPERTY] = stash
+    return True
+
+
+def restore_suspension_keys(ob):
+    stash = ob.get(SUSPENSION_KEYS_PROPERTY)
+    if stash is None:
+        return
+    del ob[SUSPENSION_KEYS_PROPERTY]
+    copy_fcurves(stash, ensure_action(ob), SUSPENSION_LOCATION, action_group='Suspension')
+    bpy.data.actions.remove(stash)
+
+
+def clear_dynamics(ob, keep_cache=False):
+    """Remove the baked or cached body dynamics of a rig, deleting its cache file unless keep_cache."""
+    path = bpy.path.abspath(ob.get(DYNAMICS_CACHE_PROPERTY, ''))
+    if ob.animation_data is not None and ob.animation_data.action is not None:
+        action = ob.animation_data.action
+        for i in range(3):
+            fcurve = action.fcurves.find(SUSPENSION_LOCATION, index=i)
+            if fcurve is not None:
+                action.fcurves.remove(fcurve)
+    ob.pose.bones['Suspension'].location = (0, 0, 0)
+    for name in (DYNAMICS_CACHE_PROPERTY, DYNAMICS_CACHE_FRAME_START_PROPERTY, DYNAMICS_CACHE_SUBSTEPS_PROPERTY):
+        if name in ob:
+            del ob[name]
+    stale_caches.discard(ob.name)
+    cache_signatures.pop(ob.name, None)
+    if not keep_cache:
+        remove_cache(path)
+
+
+def cache_directory():
+    """Caches are stored next to the blend file, or in the temporary directory if it is not saved yet."""
+    if bpy.data.filepath:
+        return bpy.path.abspath('//rigacar_cache')
+    return os.path.join(tempfile.gettempdir(), 'rigacar_cache')
+
+
+def dynamics_targets(ob):
+    """The path and ground objects followed by a rig."""
+    return {cns.target for pose_bone in ob.pose.bones for cns in pose_bone.constraints
+            if cns.type in ('FOLLOW_PATH', 'SHRINKWRAP') and cns.target is not None and not cns.mute}
+
+
+def geometry_signature(ob):
+    """Number of points and bounding box of the geometry of an object, a cheap stand-in for hashing all its points."""
+    data = ob.data
+    if isinstance(data, bpy.types.Mesh):
+        count = len(data.vertices)
+    elif isinstance(data, bpy.types.Curve):
+        count = sum(len(spline.points) + len(spline.bezier_points) for spline in data.splines)
+    else:
+        count = 0
+    return count, tuple(tuple(corner) for corner in ob.bound_box)
+
+
+def dynamics_signature(ob):
+    """Everything the simulation of a rig depends on but its action, compared before hashing again."""
+    constraints = [(cns.target.name, tuple(map(tuple, cns.target.matrix_world)), getattr(cns, 'offset', 0))
+                   for pose_bone in ob.pose.bones for cns in pose_bone.constraints
+                   if cns.type in ('FOLLOW_PATH', 'SHRINKWRAP') and cns.target is not None and not cns.mute]
+    targets = sorted((target.name, geometry_signature(target)) for target in dynamics_targets(ob))
+    return dynamics_parameters(ob), tuple(map(tuple, ob.matrix_world)), constraints, targets
+
+
+def dynamics_key(ob, frames, fps, substeps):
+    """
+    Hash of everything the simulation of a rig depends on: the keys of its action (but the baked Suspension location),
+    the path and ground it follows, the physics parameters and the simulated frames.
+    """
+    import numpy as np
+    sha1 = hashlib.sha1()
+    sha1.update(repr((int(frames[0]), int(frames[-1]), fps, substeps, dynamics_parameters(ob))).encode())
+    sha1.update(np.asarray(ob.matrix_world, dtype=np.float32).tobytes())
+    if ob.animation_data is not None and ob.animation_data.action is not None:
+        for fcurve in sorted(ob.animation_data.action.fcurves, key=lambda fc: (fc.data_path, fc.array_index)):
+            if fcurve.data_path == SUSPENSION_LOCATION:
+                continue
+            sha1.update(('%s[%d]' % (fcurve.data_path, fcurve.array_index)).encode())
+            for attr in ('co', 'handle_left', 'handle_right'):
+                values = np.empty(len(fcurve.keyframe_points) * 2, dtype=np.float32)
+                fcurve.keyframe_points.foreach_get(attr, values)
+                sha1.update(values.tobytes())
+    for pose_bone in ob.pose.bones:
+        for cns in pose_bone.constraints:
+            if cns.type in ('FOLLOW_PATH', 'SHRINKWRAP') and cns.target is not None and not cns.mute:
+                sha1.update(cns.target.name.encode())
+                sha1.update(np.asarray(cns.target.matrix_world, dtype=np.float32).tobytes())
+                sha1.update(repr(getattr(cns, 'offset', 0)).encode())
+                sha1.update(repr(geometry_signature(cns.target)).encode())
+    return sha1.hexdigest()
+
+
+def cache_path(ob, key):
+    return os.path.join(cache_directory(), '%s-%s.npy' % (re.sub(r'[^\w.-]', '_', ob.name), key))
+
+
+def write_cache(path, locations):
+    """Write the Suspension locations (frames, 3) of a rig, in a temporary file first so a cache is never half written."""
+    import numpy as np
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    cache = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=locations.shape)
+    cache[:] = locations
+    cache.flush()
+    del cache
+    os.replace(tmp_path, path)
+
+
+# memory mapped caches by path, opened on first read
+cache_maps = {}
+stale_caches = set()
+# dynamics_signature of the cached rigs by name, when their cache was last checked
+cache_signatures = {}
+
+
+def remove_cache(path):
+    """Delete a cache file, unless an object (a copy of the rig) still reads it."""
+    if not path or any(bpy.path.abspath(o.get(DYNAMICS_CACHE_PROPERTY, '')) == path for o in bpy.data.objects):
+        return
+    # the memory map keeps the file open
+    cache_maps.pop(path, None)
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def read_cache(path, nb_frames=None):
+    import numpy as np
+    cache = cache_maps.get(path)
+    if cache is None:
+        try:
+            cache = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if cache.ndim != 2 or cache.shape[1] != 3 or (nb_frames is not None and cache.shape[0] != nb_frames):
+            return None
+        cache_maps[path] = cache
+    return cache
+
+
+def cached_rigs(scene):
+    return [ob for ob in scene.objects if ob.get(DYNAMICS_PROPERTY) == 'CACHED' and ob.pose is not None]
+
+
+@persistent
+def apply_dynamics_caches(scene, depsgraph=None):
+    """Frame change handler reading the Suspension location of the cached rigs, only the current frame is loaded."""
+    for ob in cached_rigs(scene):
+        suspension = ob.pose.bones.get('Suspension')
+        cache = None if ob.name in stale_caches else read_cache(bpy.path.abspath(ob.get(DYNAMICS_CACHE_PROPERTY, '')))
+        if suspension is None or cache is None:
+            continue
+        frame = min(max(scene.frame_current - ob.get(DYNAMICS_CACHE_FRAME_START_PROPERTY, 0), 0), len(cache) - 1)
+        suspension.location = cache[frame]
+
+
+def check_dynamics_cache(ob, scene):
+    """Flag the cache of the rig as stale if its file is missing or if the rig changed since it was written."""
+    import numpy as np
+    path = bpy.path.abspath(ob.get(DYNAMICS_CACHE_PROPERTY, ''))
+    key = os.path.splitext(path)[0].rsplit('-', 1)[-1]
+    frame_start = ob.get(DYNAMICS_CACHE_FRAME_START_PROPERTY, 0)
+    cache = read_cache(path)
+    valid = cache is not None
+    if valid:
+        frames = np.arange(frame_start, frame_start + len(cache))
+        valid = dynamics_key(ob, frames, scene.render.fps / scene.render.fps_base, ob.get(DYNAMICS_CACHE_SUBSTEPS_PROPERTY, 4)) == key
+    if valid:
+        stale_caches.discard(ob.name)
+    else:
+        stale_caches.add(ob.name)
+    cache_signatures[ob.name] = dynamics_signature(ob)
+
+
+@persistent
+def invalidate_dynamics_caches(scene, depsgraph=None):
+    rigs = cached_rigs(scene)
+    if not rigs:
+        return
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+    updated = {update.id.original for update in depsgraph.updates
+               if isinstance(update.id, (bpy.types.Action, bpy.types.Object, bpy.types.Mesh, bpy.types.Curve))}
+    if not updated:
+        return
+    for ob in rigs:
+        if ob.animation_data is not None and ob.animation_data.action in updated:
+            check_dynamics_cache(ob, scene)
+            continue
+        # the cached rigs are updated at each frame change: the signature is compared before hashing the action again
+        targets = dynamics_targets(ob)
+        if (ob in updated or any(t in updated or t.data in updated for t in targets)) and \
+                dynamics_signature(ob) != cache_signatures.get(ob.name):
+            check_dynamics_cache(ob, scene)
+
+
+@persistent
+def load_dynamics_caches(dummy):
+    cache_maps.clear()
+    stale_caches.clear()
+    cache_signatures.clear()
+    for scene in bpy.data.scenes:
+        for ob in cached_rigs(scene):
+            check_dynamics_cache(ob, scene)
+
+
+class DynamicsBakingOperator(BakingOperator):
+
+    substeps: bpy.props.IntProperty(name='Substeps', description='Integration steps per frame', min=1, default=4)
+    use_cache: bpy.props.BoolProperty(name='Disk cache',
+                                      description='Store the simulation in a cache file read at frame change instead of keys, '
+                                                  'reused as long as the motion of the car does not change',
+                                      default=False)
+
+    def draw(self, context):
+        super().draw(context)
+        self.layout.prop(self, 'substeps')
+        self.layout.prop(self, 'use_cache')
+
+    @cursor('WAIT')
+    def _bake_dynamics(self, context, rigs):
+        import numpy as np
+        frames = np.arange(self.frame_start, self.frame_end + 1)
+        fps = context.scene.render.fps / context.scene.render.fps_base
+        # the previous caches are deleted once replaced, an unchanged rig reuses its own
+        previous_paths = [bpy.path.abspath(ob.get(DYNAMICS_CACHE_PROPERTY, '')) for ob in rigs]
+        stashed = []
+        for ob in rigs:
+            ensure_action(ob)
+            # once baked, the Suspension location keys are the ones of a previous bake
+            if not ob.get(DYNAMICS_PROPERTY) and stash_suspension_keys(ob):
+                stashed.append(ob.name)
+            clear_dynamics(ob, keep_cache=True)
+            set_soft_body_enabled(ob, False)
+        if stashed:
+            self.report({'INFO'}, 'Suspension keys put aside until the dynamics are cleared: %s' % ', '.join(stashed))
+
+        if not self.use_cache:
+            locations = self._simulate(context, rigs, frames, fps)
+            for i, ob in enumerate(rigs):
+                action = ob.animation_data.action
+                for axis in range(3):
+                    write_fcurve_samples(action, SUSPENSION_LOCATION, axis, frames, locations[:, i, axis], action_group='Suspension')
+                ob[DYNAMICS_PROPERTY] = 'BAKED'
+            for path in previous_paths:
+                remove_cache(path)
+            return
+
+        # only the rigs without a valid cache are simulated
+        paths = [cache_path(ob, dynamics_key(ob, frames, fps, self.substeps)) for ob in rigs]
+        missing = [i for i, path in enumerate(paths) if read_cache(path, len(frames)) is None]
+        if missing:
+            locations = self._simulate(context, [rigs[i] for i in missing], frames, fps)
+            for column, i in enumerate(missing):
+                cache_maps.pop(paths[i], None)
+                write_cache(paths[i], locations[:, column])
+        for ob, path in zip(rigs, paths):
+            ob[DYNAMICS_CACHE_PROPERTY] = bpy.path.relpath(path) if bpy.data.filepath else path
+            ob[DYNAMICS_CACHE_FRAME_START_PROPERTY] = int(frames[0])
+            ob[DYNAMICS_CACHE_SUBSTEPS_PROPERTY] = self.substeps
+            ob[DYNAMICS_PROPERTY] = 'CACHED'
+            cache_signatures[ob.name] = dynamics_signature(ob)
+        for path in previous_paths:
+            remove_cache(path)
+        apply_dynamics_caches(context.scene)
+
+    def _simulate(self, context, rigs, frames, fps):
+        """Suspension locations (frames, rigs, 3) of the rigs."""
+        import numpy as np
+        from . import dynamics
+        # the goal of the body is the middle of the axles, or the root if the rig has no axle sensor
+        rigs_bones = [(ob, ['Root', 'Suspension'] + [n for n in AXLE_SENSORS if n in ob.pose.bones]) for ob in rigs]
+        samples = sample_bone_matrices(context.scene, rigs_bones, frames)
+        goal = np.stack([m[:, 2:, :3, 3].mean(axis=1) if m.shape[1] > 2 else m[:, 0, :3, 3] for m in samples], axis=1)
+        root = np.stack([m[:, 0] for m in samples], axis=1)
+        suspension = np.stack([m[:, 1] for m in samples], axis=1)
+
+        parameters = [dynamics_parameters(ob) for ob in rigs]
+        mass, stiffness, friction, influence = (np.array(p, dtype=np.float64) for p in zip(*parameters))
+        offsets = dynamics.simulate(goal, mass, stiffness, friction, fps, self.substeps)
+
+        # as for the soft body constraints, the body motion is filtered in the space of the root
+        local_offsets = dynamics.to_local(offsets, root) * influence
+        return dynamics.to_pose_location(dynamics.to_world(local_offsets, root), suspension)
+
+
+class ANIM_OT_carDynamicsBake(bpy.types.Operator, DynamicsBakingOperator):
+    bl_idname = 'anim.car_dynamics_bake'
+    bl_label = 'Bake body dynamics'
+    bl_description = 'Simulates the roll, pitch and heave of the body and bakes them on the Suspension bone instead of the soft body'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return super().poll(context) and is_dynamics_rig(context.object) and not context.object.get(PHYSICS_FROZEN_PROPERTY)
+
+    def execute(self, context):
+        if self.frame_end > self.frame_start:
+            self._bake_dynamics(context, [context.object])
+        return {'FINISHED'}
+
+
+class ANIM_OT_carFleetDynamicsBake(bpy.types.Operator, DynamicsBakingOperator):
+    bl_idname = 'anim.car_fleet_dynamics_bake'
+    bl_label = 'Bake fleet dynamics'
+    bl_description = 'Simulates the body dynamics of many car rigs together and bakes them on their Suspension bones'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    only_selected: bpy.props.BoolProperty(name='Only selected',
+                                          description='Simulate the selected car rigs only instead of all the rigs of the scene',
+                                          default=True)
+
+    def draw(self, context):
+        super().draw(context)
+        self.layout.prop(self, 'only_selected')
+
+    def execute(self, context):
+        objects = context.selected_objects if self.only_selected else context.scene.objects
+        rigs = [o for o in objects if is_dynamics_rig(o)]
+        if context.object not in rigs and is_dynamics_rig(context.object):
+            rigs.append(context.object)
+        if self.frame_end > self.frame_start and rigs:
+            start = time.perf_counter()
+            # all the rigs are stacked in the same arrays and stepped together by the solver
+            self._bake_dynamics(context, rigs)
+            self.report({'INFO'}, '%d rigs simulated in %.2fs' % (len(rigs), time.perf_counter() - start))
+        return {'FINISHED'}
+
+
+class ANIM_OT_carDynamicsClear(bpy.types.Operator):
+    bl_idname = 'anim.car_dynamics_clear'
+    bl_label = 'Clear body dynamics'
+    bl_description = 'Removes the baked body dynamics and restores the soft body'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.get(DYNAMICS_PROPERTY)
+
+    def execute(self, context):
+        ob = context.object
+        clear_dynamics(ob)
+        restore_suspension_keys(ob)
+        set_soft_body_enabled(ob, True)
+        del ob[DYNAMICS_PROPERTY]
+        return {'FINISHED'}
+
+
+def set_soft_body_enabled(ob, enabled):
+    physics = find_physics_object(ob)
+    if physics is not None:
+        for modifier in physics.modifiers:
+            if modifier.type == 'SOFT_BODY':
+                modifier.show_viewport = enabled
+                modifier.show_render = enabled
+    for cns in physics_constraints(ob):
+        cns.mute = not enabled
+
+
+class ANIM_OT_carPhysicsFreeze(bpy.types.Operator, BakingOperator):
+    bl_idname = 'anim.car_physics_freeze'
+    bl_label = 'Freeze physics'
+    bl_description = 'Bakes the soft body motion of the Suspension bone into keys and disables the soft body'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return (super().poll(context) and is_dynamics_rig(context.object) and find_physics_object(context.object) is not None and
+                not context.object.get(PHYSICS_FROZEN_PROPERTY) and not context.object.get(DYNAMICS_PROPERTY))
+
+    def execute(self, context):
+        if self.frame_end > self.frame_start:
+            self._freeze_physics(context)
+        return {'FINISHED'}
+
+    @cursor('WAIT')
+    def _freeze_physics(self, context):
+        import numpy as np
+        from . import dynamics
+        ob = context.object
+        # a rig only following a path has no action to bake from
+        ensure_action(ob)
+        stash_suspension_keys(ob)
+        clear_dynamics(ob)
+        baked_action = self._bake_action(context, ob.data.bones['Suspension'])
+        frames = np.arange(self.frame_start, self.frame_end + 1)
+        try:
+            values = np.zeros((len(frames), 3))
+            for axis in range(3):
+                fcurve = baked_action.fcurves.find(SUSPENSION_LOCATION, index=axis)
+                if fcurve is not None and len(fcurve.keyframe_points):
+                    co = np.empty(len(fcurve.keyframe_points) * 2, dtype=np.float32)
+                    fcurve.keyframe_points.foreach_get('co', co)
+                    values[:, axis] = np.interp(frames, co[0::2], co[1::2])
+        finally:
+            bpy.data.actions.remove(baked_action)
+
+        keep = dynamics.reduce_keyframes(frames, values, self.keyframe_tolerance)
+        action = ob.animation_data.action
+        for axis in range(3):
+            fcurve = write_fcurve_samples(action, SUSPENSION_LOCATION, axis, frames[keep], values[keep, axis], action_group='Suspension')
+            for keyframe in fcurve.keyframe_points:
+                keyframe.interpolation = 'LINEAR'
+
+        set_soft_body_enabled(ob, False)
+        ob[PHYSICS_FROZEN_PROPERTY] = True
+        self.report({'INFO'}, 'Physics frozen in %d keys for %d frames' % (len(keep), len(frames)))
+
+
+class ANIM_OT_carPhysicsUnfreeze(bpy.types.Operator):
+    bl_idname = 'anim.car_physics_unfreeze'
+    bl_label = 'Unfreeze physics'
+    bl_description = 'Removes the frozen keys of the Suspension bone and enables the soft body again'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.get(PHYSICS_FROZEN_PROPERTY)
+
+    def execute(self, context):
+        ob = context.object
+        clear_dynamics(ob)
+        restore_suspension_keys(ob)
+        set_soft_body_enabled(ob, True)
+        del ob[PHYSICS_FROZEN_PROPERTY]
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(ANIM_OT_carDynamicsBake)
+    bpy.utils.register_class(ANIM_OT_carFleetDynamicsBake)
+    bpy.utils.register_class(ANIM_OT_carDynamicsClear)
+    bpy.utils.register_class(ANIM_OT_carPhysicsFreeze)
+    bpy.utils.register_class(ANIM_OT_carPhysicsUnfreeze)
+    bpy.app.handlers.frame_change_pre.append(apply_dynamics_caches)
+    bpy.app.handlers.depsgraph_update_post.append(invalidate_dynamics_caches)
+    bpy.app.handlers.load_post.append(load_dynamics_caches)
+
+
+def unregister():
+    bpy.app.handlers.load_post.remove(load_dynamics_caches)
+    bpy.app.handlers.depsgraph_update_post.remove(invalidate_dynamics_caches)
+    bpy.app.handlers.frame_change_pre.remove(apply_dynamics_caches)
+    cache_maps.clear()
+    bpy.utils.unregister_class(ANIM_OT_carPhysicsUnfreeze)
+    bpy.utils.unregister_class(ANIM_OT_carPhysicsFreeze)
+    bpy.utils.unregister_class(ANIM_OT_carDynamicsClear)
+    bpy.utils.unregister_class(ANIM_OT_carFleetDynamicsBake)
+    bpy.utils.unregister_class(ANIM_OT_carDynamicsBake)
+
+
+if __name__ == "__main__":
+    register()
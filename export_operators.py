@@ -0,0 +1,192 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import struct
+import bpy
+from bpy_extras.io_utils import ExportHelper
+from .bake_operators import pose_bone_matrices
+from .car_rig import find_proxy_object
+
+# the file starts with a header and the names of the tracks, followed by chunks of frames.
+# A chunk is a chunk header then, track after track, the (frames, 3, 4) float32 world matrices of the track
+# (the last row of the matrices is always 0, 0, 0, 1 and is not stored), all little endian.
+# With delta encoding, the first frame of a chunk is absolute and the next ones are the difference with the
+# previous frame, computed on the bit patterns of the floats as wrapping uint32: the cumulative sum of a chunk
+# gives the exact matrices back. Slow motions give small integers, whose zero high bytes compress better.
+# Version 1 stored the differences as floats, which drifted along a chunk: such files are still read.
+TRACKS_MAGIC = b'RCTR'
+TRACKS_VERSION = 2
+TRACKS_DELTA_ENCODED = 1
+HEADER = struct.Struct('<4sIiiIfII')
+TRACK_NAME = struct.Struct('<H')
+CHUNK_HEADER = struct.Struct('<iI')
+VALUES_PER_FRAME = 12
+
+
+def export_tracks(f, scene, rigs, frame_start, frame_end, chunk_size=1024, delta_encoding=False, proxies=True):
+    """
+    Write the world matrices of the DEF bones of the rigs, and of their proxy objects, from frame_start to frame_end
+    to the binary file f. The scene is evaluated once per frame and a single chunk of frames is kept in memory.
+    Return the number of tracks.
+    """
+    import numpy as np
+
+    tracks = []
+    names = []
+    for ob in rigs:
+        bone_names = [b.name for b in ob.pose.bones if b.name.startswith('DEF-')]
+        indices = np.array([ob.pose.bones.find(name) for name in bone_names], dtype=np.int64)
+        proxy = find_proxy_object(ob) if proxies else None
+        tracks.append((ob, indices, proxy))
+        names.extend('%s/%s' % (ob.name, name) for name in bone_names)
+        if proxy is not None:
+            names.append(proxy.name)
+
+    frames = range(frame_start, frame_end + 1)
+    f.write(HEADER.pack(TRACKS_MAGIC, TRACKS_VERSION, frame_start, frame_end, len(names), scene.render.fps / scene.render.fps_base,
+                        chunk_size, TRACKS_DELTA_ENCODED if delta_encoding else 0))
+    for name in names:
+        encoded_name = name.encode('utf-8')
+        f.write(TRACK_NAME.pack(len(encoded_name)))
+        f.write(encoded_name)
+
+    chunk = np.empty((chunk_size, len(names), 3, 4), dtype=np.float32)
+    frame_current = scene.frame_current
+    try:
+        for chunk_start in range(0, len(frames), chunk_size):
+            chunk_frames = frames[chunk_start:chunk_start + chunk_size]
+            for i, frame in enumerate(chunk_frames):
+                scene.frame_set(frame)
+                track = 0
+                for ob, indices, proxy in tracks:
+                    matrices = np.asarray(ob.matrix_world, dtype=np.float32) @ pose_bone_matrices(ob, indices)
+                    chunk[i, track:track + len(indices)] = matrices[:, :3]
+                    track += len(indices)
+                    if proxy is not None:
+                        chunk[i, track] = np.asarray(proxy.matrix_world, dtype=np.float32)[:3]
+                        track += 1
+
+            values = chunk[:len(chunk_frames)]
+            if delta_encoding:
+                bits = values.view(np.uint32)
+                values = np.concatenate((bits[:1], np.diff(bits, axis=0)))
+            f.write(CHUNK_HEADER.pack(chunk_frames[0], len(chunk_frames)))
+            # columnar: all the frames of a track are contiguous
+            f.write(np.ascontiguousarray(values.transpose(1, 0, 2, 3)).astype('<u4' if delta_encoding else '<f4', copy=False).tobytes())
+    finally:
+        scene.frame_set(frame_current)
+    return len(names)
+
+
+def read_tracks(path):
+    """
+    Read a file written by export_tracks. Return the header as a dict and the matrices by track name,
+    (frames, 4, 4) float32 arrays.
+    """
+    import numpy as np
+
+    with open(path, 'rb') as f:
+        magic, version, frame_start, frame_end, nb_tracks, fps, chunk_size, flags = HEADER.unpack(f.read(HEADER.size))
+        if magic != TRACKS_MAGIC or version not in (1, TRACKS_VERSION):
+            raise ValueError('%s is not a track file' % path)
+        names = []
+        for _ in range(nb_tracks):
+            name_size, = TRACK_NAME.unpack(f.read(TRACK_NAME.size))
+            names.append(f.read(name_size).decode('utf-8'))
+
+        nb_frames = frame_end - frame_start + 1
+        matrices = np.zeros((nb_tracks, nb_frames, 4, 4), dtype=np.float32)
+        matrices[..., 3, 3] = 1
+        for _ in range(0, nb_frames, chunk_size):
+            first_frame, chunk_frames = CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))
+            values = np.frombuffer(f.read(nb_tracks * chunk_frames * VALUES_PER_FRAME * 4), dtype='<f4')
+            values = values.reshape(nb_tracks, chunk_frames, 3, 4)
+            if flags & TRACKS_DELTA_ENCODED and version == 1:
+                values = np.cumsum(values, axis=1)
+            elif flags & TRACKS_DELTA_ENCODED:
+                values = np.cumsum(values.view('<u4'), axis=1, dtype=np.uint32).view(np.float32)
+            start = first_frame - frame_start
+            matrices[:, start:start + chunk_frames, :3] = values
+
+    header = dict(frame_start=frame_start, frame_end=frame_end, fps=fps, chunk_size=chunk_size,
+                  delta_encoding=bool(flags & TRACKS_DELTA_ENCODED))
+    return header, dict(zip(names, matrices))
+
+
+def is_car_rig(ob):
+    return ob is not None and ob.type == 'ARMATURE' and ob.data.get('Car Rig')
+
+
+class EXPORT_SCENE_OT_carTransforms(bpy.types.Operator, ExportHelper):
+    bl_idname = 'export_scene.car_transforms'
+    bl_label = 'Export car transforms'
+    bl_description = 'Exports the world transforms of the deformation bones and of the proxy of the selected car rigs, frame by frame'
+    bl_options = {'REGISTER'}
+
+    filename_ext = '.rctr'
+    filter_glob: bpy.props.StringProperty(default='*.rctr', options={'HIDDEN'})
+
+    frame_start: bpy.props.IntProperty(name='Start Frame', default=1)
+    frame_end: bpy.props.IntProperty(name='End Frame', default=250)
+    chunk_size: bpy.props.IntProperty(name='Chunk size', description='Number of frames sampled before being written',
+                                      min=1, default=1024)
+    delta_encoding: bpy.props.BoolProperty(name='Delta encoding',
+                                           description='Store the exact difference with the previous frame, small integers which compress better',
+                                           default=False)
+    proxies: bpy.props.BoolProperty(name='Proxies', description='Export the proxy objects of the rigs', default=True)
+
+    @classmethod
+    def poll(cls, context):
+        return any(is_car_rig(o) for o in context.selected_objects)
+
+    def invoke(self, context, event):
+        self.frame_start = context.scene.frame_start
+        self.frame_end = context.scene.frame_end
+        return ExportHelper.invoke(self, context, event)
+
+    def execute(self, context):
+        if self.frame_end < self.frame_start:
+            self.report({'ERROR'}, 'End frame is before start frame')
+            return {'CANCELLED'}
+
+        rigs = [o for o in context.selected_objects if is_car_rig(o)]
+        with open(self.filepath, 'wb') as f:
+            nb_tracks = export_tracks(f, context.scene, rigs, self.frame_start, self.frame_end,
+                                      self.chunk_size, self.delta_encoding, self.proxies)
+        self.report({'INFO'}, '%d tracks of %d frames exported' % (nb_tracks, self.frame_end - self.frame_start + 1))
+        return {'FINISHED'}
+
+
+def menu_entries(menu, context):
+    menu.layout.operator(EXPORT_SCENE_OT_carTransforms.bl_idname, text='Rigacar transforms (.rctr)')
+
+
+def register():
+    bpy.utils.register_class(EXPORT_SCENE_OT_carTransforms)
+    bpy.types.TOPBAR_MT_file_export.append(menu_entries)
+
+
+def unregister():
+    bpy.types.TOPBAR_MT_file_export.remove(menu_entries)
+    bpy.utils.unregister_class(EXPORT_SCENE_OT_carTransforms)
+
+
+if __name__ == "__main__":
+    register()
@@ -0,0 +1,753 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import bpy
+import bmesh
+import mathutils
+from bpy.app.handlers import persistent
+from mathutils.bvhtree import BVHTree
+from .bake_operators import BakingOperator, cursor, pose_bone_matrices, sample_bone_matrices, write_fcurve_samples
+from .bone_roles import POSITIONS, SIDES, get_roles
+
+GROUND_ENGINE_PROPERTY = 'ground_engine'
+GROUND_PROJECTION = 'Ground projection'
+GROUND_PROJECTION_LIMITATION = 'Ground projection limitation'
+GROUND_PROXY_SOURCE_PROPERTY = 'Ground Proxy Source'
+SUSPENSION_BAKED_PROPERTY = 'suspension_baked'
+SUSPENSION_ROTATION_MODE_PROPERTY = 'suspension_rotation_mode'
+
+# number of (triangle, grid node) pairs tested at once while rasterizing
+RASTER_CHUNK_SIZE = 1 << 22
+
+
+class HeightField(object):
+    """
+    Height of the top surface of a mesh sampled on a regular grid of world XY positions.
+    Nodes not covered by the mesh are NaN.
+    """
+
+    def __init__(self, ground, depsgraph, cell_size):
+        import numpy as np
+        self.cell_size = cell_size
+        self.matrix_world = tuple(v for row in ground.matrix_world for v in row)
+        ground_eval = ground.evaluated_get(depsgraph)
+        mesh = ground_eval.to_mesh()
+        try:
+            mesh.calc_loop_triangles()
+            co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+            mesh.vertices.foreach_get('co', co)
+            triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int64)
+            mesh.loop_triangles.foreach_get('vertices', triangles)
+        finally:
+            ground_eval.to_mesh_clear()
+
+        matrix = np.asarray(ground.matrix_world, dtype=np.float64)
+        co = co.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+        triangles = triangles.reshape(-1, 3)
+
+        if len(co):
+            self.origin = co[:, :2].min(axis=0)
+            shape = np.floor((co[:, :2].max(axis=0) - self.origin) / cell_size).astype(np.int64) + 2
+        else:
+            self.origin = np.zeros(2)
+            shape = np.array((2, 2))
+        self.heights = np.full(tuple(shape), -np.inf)
+        self._rasterize(co, triangles)
+        self.heights[np.isneginf(self.heights)] = np.nan
+
+    def _rasterize(self, co, triangles):
+        import numpy as np
+        a, b, c = (co[triangles[:, i]] for i in range(3))
+        xy = np.stack((a[:, :2], b[:, :2], c[:, :2]), axis=1)
+        node_min = np.ceil((xy.min(axis=1) - self.origin) / self.cell_size).astype(np.int64)
+        node_max = np.floor((xy.max(axis=1) - self.origin) / self.cell_size).astype(np.int64)
+        span = np.maximum(node_max - node_min + 1, 0).max(axis=1)
+
+        # triangles are grouped by the size of the window of nodes they cover so that
+        # small triangles (the common case on dense meshes) do not pay for the big ones
+        window_sizes = np.zeros_like(span)
+        covering = span > 0
+        window_sizes[covering] = 2 ** np.ceil(np.log2(span[covering])).astype(np.int64)
+        for window_size in np.unique(window_sizes[covering]):
+            selected = np.flatnonzero(window_sizes == window_size)
+            offsets = np.stack(np.meshgrid(np.arange(window_size), np.arange(window_size), indexing='ij'), axis=-1).reshape(-1, 2)
+            chunk = max(1, RASTER_CHUNK_SIZE // len(offsets))
+            for start in range(0, len(selected), chunk):
+                t = selected[start:start + chunk]
+                self._rasterize_window(a[t], b[t], c[t], node_min[t], node_max[t], offsets)
+
+    def _rasterize_window(self, a, b, c, node_min, node_max, offsets):
+        import numpy as np
+        nodes = node_min[:, None, :] + offsets[None, :, :]
+        valid = (nodes <= node_max[:, None, :]).all(axis=2)
+        p = self.origin + nodes * self.cell_size
+
+        v0 = (b - a)[:, None, :]
+        v1 = (c - a)[:, None, :]
+        v2 = p - a[:, None, :2]
+        det = v0[..., 0] * v1[..., 1] - v1[..., 0] * v0[..., 1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            u = (v2[..., 0] * v1[..., 1] - v1[..., 0] * v2[..., 1]) / det
+            v = (v0[..., 0] * v2[..., 1] - v2[..., 0] * v0[..., 1]) / det
+        eps = 1e-9
+        valid &= (np.abs(det) > eps) & (u >= -eps) & (v >= -eps) & (u + v <= 1 + eps)
+
+        z = a[:, None, 2] + u * v0[..., 2] + v * v1[..., 2]
+        flat_index = nodes[..., 0] * self.heights.shape[1] + nodes[..., 1]
+        np.maximum.at(self.heights.reshape(-1), flat_index[valid], z[valid])
+
+    def lookup(self, xy):
+        """Bilinear interpolation of the heights at world XY positions, an (n, 2) array."""
+        import numpy as np
+        grid = (np.asarray(xy, dtype=np.float64) - self.origin) / self.cell_size
+        i = np.floor(grid).astype(np.int64)
+        inside = ((i >= 0) & (i < np.array(self.heights.shape) - 1)).all(axis=1)
+        i = np.clip(i, 0, np.array(self.heights.shape) - 2)
+        fx, fy = (grid - i).T
+        h00 = self.heights[i[:, 0], i[:, 1]]
+        h10 = self.heights[i[:, 0] + 1, i[:, 1]]
+        h01 = self.heights[i[:, 0], i[:, 1] + 1]
+        h11 = self.heights[i[:, 0] + 1, i[:, 1] + 1]
+        heights = (h00 * (1 - fx) + h10 * fx) * (1 - fy) + (h01 * (1 - fx) + h11 * fx) * fy
+        # at the border of the ground, use the highest of the defined corners
+        partial = np.isnan(heights)
+        if partial.any():
+            with np.errstate(invalid='ignore'):
+                heights[partial] = np.fmax(np.fmax(h00, h10), np.fmax(h01, h11))[partial]
+        heights[~inside] = np.nan
+        return heights
+
+
+heightfields = {}
+
+
+def get_heightfield(ground, depsgraph, cell_size):
+    """Heightfield of a ground object, rasterized again only when the ground or the resolution changed."""
+    heightfield = heightfields.get(ground.name)
+    matrix_world = tuple(v for row in ground.matrix_world for v in row)
+    if heightfield is None or heightfield.cell_size != cell_size or heightfield.matrix_world != matrix_world:
+        heightfield = heightfields[ground.name] = HeightField(ground, depsgraph, cell_size)
+    return heightfield
+
+
+bvhtrees = {}
+
+
+def get_bvhtree(ground, depsgraph):
+    """BVH tree of a ground object in its local space, shared by all the rigs driving on it."""
+    bvhtree = bvhtrees.get(ground.name)
+    if bvhtree is None:
+        bvhtree = bvhtrees[ground.name] = BVHTree.FromObject(ground, depsgraph)
+    return bvhtree
+
+
+def ray_cast_heights(bvhtree, ground, points, max_distances):
+    """
+    World heights of the ground right below points, an (n, 3) array of world locations.
+    Rays are cast in the local space of the ground where the tree is built. NaN where there is no hit.
+    """
+    import numpy as np
+    matrix = np.asarray(ground.matrix_world, dtype=np.float64)
+    inverse = np.linalg.inv(matrix)
+    origins = points @ inverse[:3, :3].T + inverse[:3, 3]
+    direction = inverse[:3, :3] @ (0, 0, -1)
+    scale = np.linalg.norm(direction)
+    direction = mathutils.Vector(direction / scale)
+    locations = np.full((len(points), 3), np.nan)
+    for i, (origin, max_distance) in enumerate(zip(origins, np.broadcast_to(max_distances, len(points)))):
+        location = bvhtree.ray_cast(mathutils.Vector(origin), direction, max_distance * scale if max_distance > 0 else 1.0e10)[0]
+        if location is not None:
+            locations[i] = location
+    return (locations @ matrix[:3, :3].T + matrix[:3, 3])[:, 2]
+
+
+@persistent
+def invalidate_ground_caches(scene, depsgraph=None):
+    if not heightfields and not bvhtrees:
+        return
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Object) and update.is_updated_geometry:
+            names = [update.id.original.name]
+        elif isinstance(update.id, bpy.types.Mesh):
+            mesh = update.id.original
+            names = [o.name for o in bpy.data.objects if o.data == mesh]
+        else:
+            continue
+        for name in names:
+            heightfields.pop(name, None)
+            bvhtrees.pop(name, None)
+
+
+@persistent
+def clear_ground_caches(dummy):
+    heightfields.clear()
+    bvhtrees.clear()
+
+
+def ground_sensor_levels(ob):
+    """
+    Ground sensor names in evaluation order: the axle sensors carry the wheel sensors,
+    so they are projected first.
+    """
+    roles = get_roles(ob)
+    levels = (list(roles.names('GroundSensor.Axle')), list(roles.names('GroundSensor')))
+    return [[name for name in level if name in ob.pose.bones] for level in levels]
+
+
+def set_ground_projection_mute(ob, bone_names, mute):
+    for name in bone_names:
+        cns = ob.pose.bones[name].constraints.get(GROUND_PROJECTION)
+        if cns is not None:
+            cns.mute = mute
+
+
+class GroundContact(object):
+    """Where each ground sensor of a rig touches the ground, according to its 'Ground projection' constraint."""
+
+    def __init__(self, ob, bone_names):
+        import numpy as np
+        self.ob = ob
+        self.bone_names = bone_names
+        constraints = [ob.pose.bones[name].constraints.get(GROUND_PROJECTION) for name in bone_names]
+        limitations = [ob.pose.bones[name].constraints.get(GROUND_PROJECTION_LIMITATION) for name in bone_names]
+        self.grounds = [cns.target if cns is not None else None for cns in constraints]
+        self.distance = np.array([cns.distance if cns is not None else 0 for cns in constraints])
+        self.project_limit = np.array([cns.project_limit if cns is not None else 0 for cns in constraints])
+        self.min_z = np.array([cns.min_z if cns is not None and cns.use_min_z else -np.inf for cns in limitations])
+        self.max_z = np.array([cns.max_z if cns is not None and cns.use_max_z else np.inf for cns in limitations])
+
+    def local_z(self, matrices, heights, location_z=0):
+        """
+        Local Z location of the sensors to put them at the contact height, from their world matrices (..., bones, 4, 4),
+        the ground heights (..., bones) and their current local Z location.
+        A sensor without hit below it, as for the SHRINKWRAP projection, does not move.
+        """
+        import numpy as np
+        head_z = matrices[..., 2, 3]
+        target_z = heights + self.distance
+        hit = ~np.isnan(heights) & (heights <= head_z)
+        hit &= (self.project_limit <= 0) | (head_z - heights <= self.project_limit)
+        # the Z axis of the bone is the third row of the inverse of its world rotation
+        inverse_rotation_z = np.linalg.inv(matrices[..., :3, :3].astype(np.float64))[..., 2, 2]
+        delta = np.where(hit, (target_z - head_z) * inverse_rotation_z, 0)
+        return np.clip(location_z + delta, self.min_z, self.max_z)
+
+
+def heightfield_heights(depsgraph, cell_size):
+    """
+    Ground height lookup in the heightfields of the grounds: a function giving the heights (..., bones)
+    below the sensors of a GroundContact from their world matrices (..., bones, 4, 4).
+    """
+    def ground_heights(contact, matrices):
+        import numpy as np
+        xy = matrices[..., :2, 3]
+        heights = np.full(xy.shape[:-1], np.nan)
+        for ground in set(g for g in contact.grounds if g is not None):
+            columns = [i for i, g in enumerate(contact.grounds) if g == ground]
+            ground_xy = xy[..., columns, :]
+            heightfield = get_heightfield(ground, depsgraph, cell_size)
+            heights[..., columns] = heightfield.lookup(ground_xy.reshape(-1, 2)).reshape(ground_xy.shape[:-1])
+        return heights
+    return ground_heights
+
+
+def raycast_heights(depsgraph):
+    """Ground height lookup by casting rays on the exact geometry of the grounds, as heightfield_heights."""
+    def ground_heights(contact, matrices):
+        import numpy as np
+        heads = matrices[..., :3, 3].astype(np.float64)
+        heights = np.full(heads.shape[:-1], np.nan)
+        for ground in set(g for g in contact.grounds if g is not None):
+            columns = [i for i, g in enumerate(contact.grounds) if g == ground]
+            ground_heads = heads[..., columns, :]
+            max_distances = np.broadcast_to(contact.project_limit[columns], ground_heads.shape[:-1])
+            ground_heights = ray_cast_heights(get_bvhtree(ground, depsgraph), ground, ground_heads.reshape(-1, 3), max_distances.reshape(-1))
+            heights[..., columns] = ground_heights.reshape(ground_heads.shape[:-1])
+        return heights
+    return ground_heights
+
+
+class GroundContactBakingOperator(BakingOperator):
+    """Bakes the ground sensors of rigs."""
+
+    @cursor('WAIT')
+    def _bake_ground_contact(self, context, rigs, ground_heights):
+        """ground_heights gives the ground heights below the sensors, see heightfield_heights and raycast_heights."""
+        import numpy as np
+        frames = np.arange(self.frame_start, self.frame_end + 1)
+        rig_levels = [(ob, ground_sensor_levels(ob)) for ob in rigs]
+        for ob, levels in rig_levels:
+            if ob.animation_data is None:
+                ob.animation_data_create()
+            if ob.animation_data.action is None:
+                ob.animation_data.action = bpy.data.actions.new("%sAction" % ob.name)
+            bone_names = [name for level in levels for name in level]
+            for name in bone_names:
+                ob.pose.bones[name].location.z = 0
+            clear_ground_contact(ob, bone_names)
+            set_ground_projection_mute(ob, bone_names, True)
+
+        # the wheel sensors are children of the axle sensors: they are sampled once the axles are baked
+        for level in range(2):
+            rigs_bones = [(ob, levels[level]) for ob, levels in rig_levels if levels[level]]
+            for (ob, bone_names), matrices in zip(rigs_bones, sample_bone_matrices(context.scene, rigs_bones, frames)):
+                contact = GroundContact(ob, bone_names)
+                heights = ground_heights(contact, matrices)
+                local_z = contact.local_z(matrices, heights)
+                action = ob.animation_data.action
+                for column, name in enumerate(bone_names):
+                    write_fcurve_samples(action, 'pose.bones["%s"].location' % name, 2, frames, local_z[:, column], action_group=name)
+
+        for ob in rigs:
+            ob[GROUND_ENGINE_PROPERTY] = 'BAKED'
+
+
+class ANIM_OT_carGroundEngineBake(bpy.types.Operator, GroundContactBakingOperator):
+    bl_idname = 'anim.car_ground_engine_bake'
+    bl_label = 'Bake ground contact'
+    bl_description = 'Bakes the ground sensors on a height grid of the ground and mutes their projection constraints'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    cell_size: bpy.props.FloatProperty(name='Resolution', description='Size of the cells of the ground height grid',
+                                       min=.001, default=.1, subtype='DISTANCE')
+
+    def draw(self, context):
+        super().draw(context)
+        self.layout.prop(self, 'cell_size')
+
+    def execute(self, context):
+        if self.frame_end > self.frame_start:
+            ground_heights = heightfield_heights(context.evaluated_depsgraph_get(), self.cell_size)
+            self._bake_ground_contact(context, [context.object], ground_heights)
+        return {'FINISHED'}
+
+
+class ANIM_OT_carGroundRaycastBake(bpy.types.Operator, GroundContactBakingOperator):
+    bl_idname = 'anim.car_ground_raycast_bake'
+    bl_label = 'Bake ground contact (raycast)'
+    bl_description = ('Bakes the ground sensors of the selected car rigs by casting rays on the exact ground geometry '
+                      'and mutes their projection constraints')
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        if self.frame_end > self.frame_start:
+            rigs = [o for o in context.selected_objects if o.type == 'ARMATURE' and o.data.get('Car Rig')]
+            if context.object not in rigs:
+                rigs.append(context.object)
+            self._bake_ground_contact(context, rigs, raycast_heights(context.evaluated_depsgraph_get()))
+        return {'FINISHED'}
+
+
+def clear_ground_contact(ob, bone_names):
+    if ob.animation_data is not None and ob.animation_data.action is not None:
+        action = ob.animation_data.action
+        for name in bone_names:
+            fcurve = action.fcurves.find('pose.bones["%s"].location' % name, index=2)
+            if fcurve is not None:
+                action.fcurves.remove(fcurve)
+
+
+class ANIM_OT_carGroundEngineClear(bpy.types.Operator):
+    bl_idname = 'anim.car_ground_engine_clear'
+    bl_label = 'Clear ground contact'
+    bl_description = 'Removes the baked or live ground contact and restores the projection constraints'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.get(GROUND_ENGINE_PROPERTY)
+
+    def execute(self, context):
+        ob = context.object
+        bone_names = [name for level in ground_sensor_levels(ob) for name in level]
+        clear_ground_contact(ob, bone_names)
+        for name in bone_names:
+            ob.pose.bones[name].location.z = 0
+        set_ground_projection_mute(ob, bone_names, False)
+        del ob[GROUND_ENGINE_PROPERTY]
+        return {'FINISHED'}
+
+
+class ANIM_OT_carGroundEngineLive(bpy.types.Operator):
+    bl_idname = 'anim.car_ground_engine_live'
+    bl_label = 'Live ground contact'
+    bl_description = 'Moves the ground sensors on a height grid of the ground at each frame change instead of projecting them'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    cell_size: bpy.props.FloatProperty(name='Resolution', description='Size of the cells of the ground height grid',
+                                       min=.001, default=.1, subtype='DISTANCE')
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.data is not None and context.object.data.get('Car Rig')
+
+    def execute(self, context):
+        ob = context.object
+        bone_names = [name for level in ground_sensor_levels(ob) for name in level]
+        clear_ground_contact(ob, bone_names)
+        set_ground_projection_mute(ob, bone_names, True)
+        ob[GROUND_ENGINE_PROPERTY] = 'LIVE'
+        ob['ground_engine_cell_size'] = self.cell_size
+        update_live_ground_contact(context.scene)
+        return {'FINISHED'}
+
+
+@persistent
+def update_live_ground_contact(scene, depsgraph=None):
+    """
+    Frame change handler of the live mode: the sensors are moved to the ground heights found in the grid.
+    Axle sensors are updated before the view layer is evaluated again for the wheel sensors they carry.
+    Rendering should use baked ground contact instead.
+    """
+    import numpy as np
+    rigs = [ob for ob in scene.objects if ob.get(GROUND_ENGINE_PROPERTY) == 'LIVE' and ob.pose is not None]
+    if not rigs:
+        return
+    view_layer = bpy.context.view_layer
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    for level in range(2):
+        if level:
+            view_layer.update()
+        for ob in rigs:
+            bone_names = ground_sensor_levels(ob)[level]
+            if not bone_names:
+                continue
+            contact = GroundContact(ob, bone_names)
+            pose_bones = [ob.pose.bones[name] for name in bone_names]
+            matrices = np.asarray(ob.matrix_world) @ pose_bone_matrices(ob, [ob.pose.bones.find(name) for name in bone_names])
+            heights = heightfield_heights(depsgraph, ob.get('ground_engine_cell_size', .1))(contact, matrices)
+            local_z = contact.local_z(matrices, heights, np.array([pb.location.z for pb in pose_bones]))
+            for pb, z in zip(pose_bones, local_z):
+                pb.location.z = z
+
+
+def sample_corridor(path_xy, radius, cell_size):
+    """
+    Cells of a grid covering the corridor of the given radius around a polyline.
+    Return (origin, cell_size, summed area table of the covered cells).
+    """
+    import numpy as np
+    # densify the path so that consecutive points are closer than half a cell
+    points = [path_xy[:1]]
+    for a, b in zip(path_xy[:-1], path_xy[1:]):
+        steps = max(1, int(np.ceil(np.linalg.norm(b - a) * 2 / cell_size)))
+        points.append(a + (b - a) * (np.arange(1, steps + 1)[:, None] / steps))
+    points = np.concatenate(points)
+
+    origin = points.min(axis=0) - radius - cell_size
+    shape = np.floor((points.max(axis=0) + radius + cell_size - origin) / cell_size).astype(np.int64) + 1
+    covered = np.zeros(tuple(shape), dtype=bool)
+    reach = int(np.ceil(radius / cell_size)) + 1
+    offsets = np.stack(np.meshgrid(np.arange(-reach, reach + 1), np.arange(-reach, reach + 1), indexing='ij'), axis=-1).reshape(-1, 2)
+    offsets = offsets[np.linalg.norm(offsets, axis=1) * cell_size <= radius + cell_size]
+    cells = np.floor((points - origin) / cell_size).astype(np.int64)
+    cells = np.unique((cells[:, None, :] + offsets[None, :, :]).reshape(-1, 2), axis=0)
+    cells = cells[((cells >= 0) & (cells < shape)).all(axis=1)]
+    covered[cells[:, 0], cells[:, 1]] = True
+
+    summed_area = np.zeros((shape[0] + 1, shape[1] + 1), dtype=np.int64)
+    summed_area[1:, 1:] = covered.cumsum(axis=0).cumsum(axis=1)
+    return origin, summed_area
+
+
+def faces_in_corridor(mesh, matrix_world, origin, cell_size, summed_area):
+    """Boolean mask of the faces of the mesh whose XY bounding box touches a covered cell."""
+    import numpy as np
+    if not mesh.polygons:
+        return np.zeros(0, dtype=bool)
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get('co', co)
+    matrix = np.asarray(matrix_world, dtype=np.float64)
+    xy = (co.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3])[:, :2]
+
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int64)
+    mesh.loops.foreach_get('vertex_index', loop_vertices)
+    loop_start = np.empty(len(mesh.polygons), dtype=np.int64)
+    mesh.polygons.foreach_get('loop_start', loop_start)
+    order = np.argsort(loop_start)
+    loop_xy = xy[loop_vertices]
+    face_min = np.empty((len(loop_start), 2))
+    face_max = np.empty((len(loop_start), 2))
+    face_min[order] = np.minimum.reduceat(loop_xy, loop_start[order], axis=0)
+    face_max[order] = np.maximum.reduceat(loop_xy, loop_start[order], axis=0)
+
+    limit = np.array(summed_area.shape) - 1
+    cell_min = np.clip(np.floor((face_min - origin) / cell_size).astype(np.int64), 0, limit)
+    cell_max = np.clip(np.floor((face_max - origin) / cell_size).astype(np.int64) + 1, 0, limit)
+    count = (summed_area[cell_max[:, 0], cell_max[:, 1]] - summed_area[cell_min[:, 0], cell_max[:, 1]] -
+             summed_area[cell_max[:, 0], cell_min[:, 1]] + summed_area[cell_min[:, 0], cell_min[:, 1]])
+    return count > 0
+
+
+def find_ground(rig):
+    for pose_bone in rig.pose.bones:
+        cns = pose_bone.constraints.get(GROUND_PROJECTION)
+        if cns is not None and cns.target is not None:
+            return cns.target
+
+
+class OBJECT_OT_carGroundProxy(bpy.types.Operator):
+    bl_idname = 'object.car_ground_proxy'
+    bl_label = 'Create ground proxy'
+    bl_description = ('Creates a decimated copy of the ground cropped to the area crossed by the car '
+                      'and projects the ground sensors on it')
+    bl_options = {'REGISTER', 'UNDO'}
+
+    ground: bpy.props.StringProperty(name='Ground', description='Ground object to simplify')
+    frame_start: bpy.props.IntProperty(name='Start Frame', min=1)
+    frame_end: bpy.props.IntProperty(name='End Frame', min=1)
+    margin: bpy.props.FloatProperty(name='Margin', description='Distance kept around the car along its trajectory',
+                                    min=0, default=2, subtype='DISTANCE')
+    max_triangles: bpy.props.IntProperty(name='Max triangles', description='Triangle count of the proxy', min=16, default=20000)
+
+    @classmethod
+    def poll(cls, context):
+        return (context.object is not None and context.object.type == 'ARMATURE' and
+                context.object.data.get('Car Rig') and context.object.mode in ('POSE', 'OBJECT'))
+
+    def invoke(self, context, event):
+        ground = find_ground(context.object)
+        if ground is not None:
+            source = bpy.data.objects.get(ground.get(GROUND_PROXY_SOURCE_PROPERTY, ''))
+            self.ground = (source or ground).name
+        self.frame_start = context.scene.frame_start
+        self.frame_end = context.scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        self.layout.use_property_split = True
+        self.layout.use_property_decorate = False
+        self.layout.prop_search(self, 'ground', bpy.data, 'objects')
+        self.layout.prop(self, 'frame_start')
+        self.layout.prop(self, 'frame_end')
+        self.layout.prop(self, 'margin')
+        self.layout.prop(self, 'max_triangles')
+
+    def execute(self, context):
+        rig = context.object
+        ground = bpy.data.objects.get(self.ground)
+        if ground is None or ground.type != 'MESH':
+            self.report({'ERROR'}, 'No ground mesh to simplify')
+            return {'CANCELLED'}
+        if 'Root' not in rig.pose.bones:
+            self.report({'ERROR'}, 'No Root bone in %s' % rig.name)
+            return {'CANCELLED'}
+
+        proxy = self._create_proxy(context, rig, ground)
+        for pose_bone in rig.pose.bones:
+            cns = pose_bone.constraints.get(GROUND_PROJECTION)
+            if cns is not None:
+                cns.target = proxy
+        self.report({'INFO'}, '%s: %d triangles' % (proxy.name, sum(p.loop_total - 2 for p in proxy.data.polygons)))
+        return {'FINISHED'}
+
+    @cursor('WAIT')
+    def _create_proxy(self, context, rig, ground):
+        # the corridor is swept by the Root bone, whether it is keyed or following a path
+        import numpy as np
+        frames = np.arange(self.frame_start, max(self.frame_start, self.frame_end) + 1)
+        path_xy = sample_bone_matrices(context.scene, [(rig, ['Root'])], frames)[0][:, 0, :2, 3].astype(np.float64)
+        root_head = rig.data.bones['Root'].head_local
+        sensors = [name for level in ground_sensor_levels(rig) for name in level]
+        half_width = max([(rig.data.bones[name].head_local - root_head).length for name in sensors] or [0])
+        radius = half_width * max(rig.matrix_world.to_scale()) + self.margin
+        cell_size = max(radius / 4, .01)
+        origin, summed_area = sample_corridor(path_xy, radius, cell_size)
+
+        depsgraph = context.evaluated_depsgraph_get()
+        mesh = bpy.data.meshes.new_from_object(ground.evaluated_get(depsgraph))
+        in_corridor = faces_in_corridor(mesh, ground.matrix_world, origin, cell_size, summed_area)
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        bm.faces.ensure_lookup_table()
+        bmesh.ops.delete(bm, geom=[bm.faces[i] for i in np.flatnonzero(~in_corridor)], context='FACES')
+        bm.to_mesh(mesh)
+        bm.free()
+
+        name = '%s-GroundProxy' % rig.name
+        proxy = bpy.data.objects.get(name)
+        if proxy is None:
+            proxy = bpy.data.objects.new(name, mesh)
+            for collection in ground.users_collection or (context.collection,):
+                collection.objects.link(proxy)
+        else:
+            old_mesh = proxy.data
+            proxy.data = mesh
+            if old_mesh.users == 0:
+                bpy.data.meshes.remove(old_mesh)
+        mesh.name = name
+        proxy.matrix_world = ground.matrix_world
+        proxy.display_type = 'WIRE'
+        proxy.hide_render = True
+        proxy[GROUND_PROXY_SOURCE_PROPERTY] = ground.name
+
+        nb_triangles = sum(p.loop_total - 2 for p in mesh.polygons)
+        if nb_triangles > self.max_triangles:
+            decimate = proxy.modifiers.new('Decimate', 'DECIMATE')
+            decimate.ratio = self.max_triangles / nb_triangles
+            decimated = bpy.data.meshes.new_from_object(proxy.evaluated_get(context.evaluated_depsgraph_get()))
+            proxy.modifiers.remove(decimate)
+            proxy.data = decimated
+            bpy.data.meshes.remove(mesh)
+            decimated.name = name
+
+        heightfields.pop(name, None)
+        bvhtrees.pop(name, None)
+        return proxy
+
+
+def suspension_constraints(ob):
+    """The constraints computing the pitch and roll of the body from the wheel dampers."""
+    bone_names = ['MCH-Axis'] + ['%s.%s' % (name, position) for position in POSITIONS for name in ('MCH-Axis', 'MCH-Suspension')]
+    return [cns for name in bone_names if name in ob.pose.bones for cns in ob.pose.bones[name].constraints]
+
+
+def clear_suspension(ob):
+    if ob.animation_data is not None and ob.animation_data.action is not None:
+        action = ob.animation_data.action
+        for data_path, indices in (('pose.bones["MCH-Body"].rotation_euler', (0, 1)), ('pose.bones["MCH-Body"].location', (2,))):
+            for index in indices:
+                fcurve = action.fcurves.find(data_path, index=index)
+                if fcurve is not None:
+                    action.fcurves.remove(fcurve)
+    mch_body = ob.pose.bones['MCH-Body']
+    mch_body.location = (0, 0, 0)
+    mch_body.rotation_euler = (0, 0, 0)
+    # the bake keys the body in euler angles, its rotation mode is saved when baking
+    if SUSPENSION_ROTATION_MODE_PROPERTY in ob:
+        mch_body.rotation_mode = ob[SUSPENSION_ROTATION_MODE_PROPERTY]
+        del ob[SUSPENSION_ROTATION_MODE_PROPERTY]
+
+
+class ANIM_OT_carSuspensionBake(bpy.types.Operator, BakingOperator):
+    bl_idname = 'anim.car_suspension_bake'
+    bl_label = 'Bake suspension'
+    bl_description = ('Computes the pitch, roll and heave of the body from the ground sensors, '
+                      'bakes them on the body and mutes the suspension constraints')
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return super().poll(context) and 'MCH-Body' in context.object.pose.bones and not context.object.get(SUSPENSION_BAKED_PROPERTY)
+
+    def execute(self, context):
+        if self.frame_end > self.frame_start:
+            self._bake_suspension(context)
+        return {'FINISHED'}
+
+    @cursor('WAIT')
+    def _bake_suspension(self, context):
+        import numpy as np
+        from . import dynamics
+        ob = context.object
+        roles = get_roles(ob)
+        bones = ob.data.bones
+        slots = [(position, side, [n for n in roles.names('GroundSensor', position, side) if n in bones])
+                 for position in POSITIONS for side in SIDES]
+        slots = [slot for slot in slots if slot[2]]
+        frames = np.arange(self.frame_start, self.frame_end + 1)
+
+        # sensors are expressed in the rest space of the armature following the Root bone
+        bone_names = ['Root'] + [name for _, _, names in slots for name in names]
+        matrices = sample_bone_matrices(context.scene, [(ob, bone_names)], frames)[0].astype(np.float64)
+        root_rest = np.asarray(bones['Root'].matrix_local, dtype=np.float64)
+        heads = (root_rest @ np.linalg.inv(matrices[:, :1]) @ matrices[:, 1:])[..., :3, 3]
+        rest_heads = np.array([bones[name].head_local for name in bone_names[1:]])
+        offsets = heads[..., 2] - rest_heads[:, 2]
+
+        slot_z, slot_x, slot_y = {}, {}, {}
+        column = 0
+        for position, side, names in slots:
+            columns = slice(column, column + len(names))
+            slot_z[position, side] = offsets[:, columns].mean(axis=1)
+            slot_x[position, side] = rest_heads[columns, 0].mean()
+            slot_y[position, side] = rest_heads[columns, 1].mean()
+            column += len(names)
+        axles = [(slot_y[p, 'L'], slot_z[p, 'L'], slot_x[p, 'L'], slot_z[p, 'R'], slot_x[p, 'R'])
+                 for p in POSITIONS if (p, 'L') in slot_z and (p, 'R') in slot_z]
+        if not axles:
+            self.report({'WARNING'}, 'No pair of ground sensors in %s' % ob.name)
+            return
+
+        pitch, roll, heave = dynamics.body_attitude(axles, bones['MCH-Body'].head_local.y,
+                                                    ob.get('suspension_factor', 0), ob.get('suspension_rolling_factor', 0))
+
+        clear_suspension(ob)
+        ob[SUSPENSION_ROTATION_MODE_PROPERTY] = ob.pose.bones['MCH-Body'].rotation_mode
+        ob.pose.bones['MCH-Body'].rotation_mode = 'XYZ'
+        action = ob.animation_data.action
+        for data_path, index, values in (('rotation_euler', 0, pitch), ('rotation_euler', 1, roll), ('location', 2, heave)):
+            write_fcurve_samples(action, 'pose.bones["MCH-Body"].%s' % data_path, index, frames, values, action_group='MCH-Body')
+        for cns in suspension_constraints(ob):
+            cns.mute = True
+        ob[SUSPENSION_BAKED_PROPERTY] = True
+
+
+class ANIM_OT_carSuspensionClear(bpy.types.Operator):
+    bl_idname = 'anim.car_suspension_clear'
+    bl_label = 'Clear suspension'
+    bl_description = 'Removes the baked suspension and restores the suspension constraints'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.get(SUSPENSION_BAKED_PROPERTY)
+
+    def execute(self, context):
+        ob = context.object
+        clear_suspension(ob)
+        for cns in suspension_constraints(ob):
+            cns.mute = False
+        del ob[SUSPENSION_BAKED_PROPERTY]
+        return {'FINISHED'}
+
+
+classes = (
+    ANIM_OT_carGroundEngineBake,
+    ANIM_OT_carGroundRaycastBake,
+    ANIM_OT_carGroundEngineClear,
+    ANIM_OT_carGroundEngineLive,
+    OBJECT_OT_carGroundProxy,
+    ANIM_OT_carSuspensionBake,
+    ANIM_OT_carSuspensionClear,
+)
+
+
+def register():
+    for c in classes:
+        bpy.utils.register_class(c)
+    bpy.app.handlers.frame_change_post.append(update_live_ground_contact)
+    bpy.app.handlers.depsgraph_update_post.append(invalidate_ground_caches)
+    bpy.app.handlers.load_post.append(clear_ground_caches)
+
+
+def unregister():
+    bpy.app.handlers.load_post.remove(clear_ground_caches)
+    bpy.app.handlers.depsgraph_update_post.remove(invalidate_ground_caches)
+    bpy.app.handlers.frame_change_post.remove(update_live_ground_contact)
+    clear_ground_caches(None)
+    for c in reversed(classes):
+        bpy.utils.unregister_class(c)
+
+
+if __name__ == "__main__":
+    register()
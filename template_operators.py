@@ -0,0 +1,175 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import bpy
+import mathutils
+from .car_rig import find_physics_object, find_proxy_object
+
+TEMPLATE_PROPERTY = 'Car Rig Template'
+
+
+def is_template(ob):
+    return ob is not None and bool(ob.get(TEMPLATE_PROPERTY))
+
+
+def remap_constraint_targets(constraints, remap):
+    for cns in constraints:
+        for attr in ('target', 'space_object'):
+            target = getattr(cns, attr, None)
+            if target in remap:
+                setattr(cns, attr, remap[target])
+
+
+def remap_ids(ob, remap):
+    """Point the constraints and drivers of ob to the copies listed in remap ({original: copy})."""
+    remap_constraint_targets(ob.constraints, remap)
+    if ob.pose is not None:
+        for pose_bone in ob.pose.bones:
+            remap_constraint_targets(pose_bone.constraints, remap)
+    if ob.animation_data is not None:
+        for fcurve in ob.animation_data.drivers:
+            for var in fcurve.driver.variables:
+                for targ in var.targets:
+                    if targ.id in remap:
+                        targ.id = remap[targ.id]
+
+
+def set_ground(rig, ground):
+    for pose_bone in rig.pose.bones:
+        cns = pose_bone.constraints.get('Ground projection')
+        if cns is not None:
+            cns.target = ground
+
+
+def instantiate_template(template, collection, location, ground=None, duplicate_model=True):
+    """
+    Stamp out a copy of a generated rig. The armature data and the meshes are shared with the template,
+    only the objects are copied: the rig, its physics object, its proxy and, if duplicate_model is set,
+    the objects parented to its bones. The object-specific targets (rig, physics object, ground)
+    are remapped on the copies.
+    """
+    physics = find_physics_object(template)
+    proxy = find_proxy_object(template)
+
+    rig = template.copy()
+    if TEMPLATE_PROPERTY in rig:
+        del rig[TEMPLATE_PROPERTY]
+    rig.use_fake_user = False
+    if rig.animation_data is not None:
+        rig.animation_data.action = None
+    collection.objects.link(rig)
+    remap = {template: rig}
+
+    def copy_children(parent, parent_copy):
+        for child in parent.children:
+            if parent is template and child not in (physics, proxy) and not (duplicate_model and child.parent_type == 'BONE'):
+                continue
+            child_copy = child.copy()
+            child_copy.parent = parent_copy
+            collection.objects.link(child_copy)
+            remap[child] = child_copy
+            copy_children(child, child_copy)
+
+    copy_children(template, rig)
+
+    for ob in remap.values():
+        remap_ids(ob, remap)
+    if ground is not None:
+        set_ground(rig, ground)
+
+    rig.location = location
+    return rig
+
+
+class OBJECT_OT_carRigStoreTemplate(bpy.types.Operator):
+    bl_idname = 'object.car_rig_store_template'
+    bl_label = 'Store as template'
+    bl_description = 'Keep this generated rig as a template to instantiate copies of the same car model'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.data is not None and context.object.data.get('Car Rig')
+
+    def execute(self, context):
+        context.object[TEMPLATE_PROPERTY] = True
+        context.object.use_fake_user = True
+        context.object.data.use_fake_user = True
+        self.report({'INFO'}, '%s stored as template' % context.object.name)
+        return {'FINISHED'}
+
+
+class OBJECT_OT_carRigInstantiateTemplate(bpy.types.Operator):
+    bl_idname = 'object.car_rig_instantiate_template'
+    bl_label = 'Instantiate template'
+    bl_description = 'Create copies of the active template rig sharing its armature, without generating them again'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    count: bpy.props.IntProperty(name='Count', description='Number of copies', default=1, min=1)
+
+    offset: bpy.props.FloatVectorProperty(name='Offset',
+                                          description='Translation between two consecutive copies',
+                                          size=3,
+                                          default=(3, 0, 0),
+                                          subtype='TRANSLATION')
+
+    ground: bpy.props.StringProperty(name='Ground', description='Ground object of the copies (keep the template ground if empty)')
+
+    duplicate_model: bpy.props.BoolProperty(name='Duplicate model',
+                                            description='Create linked duplicates of the objects parented to the rig bones',
+                                            default=True)
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT' and is_template(context.object)
+
+    def draw(self, context):
+        self.layout.use_property_split = True
+        self.layout.use_property_decorate = False
+        self.layout.prop(self, 'count')
+        self.layout.prop(self, 'offset')
+        self.layout.prop_search(self, 'ground', bpy.data, 'objects')
+        self.layout.prop(self, 'duplicate_model')
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        template = context.object
+        ground = bpy.data.objects.get(self.ground) if self.ground else None
+        offset = mathutils.Vector(self.offset)
+        for i in range(1, self.count + 1):
+            instantiate_template(template, context.collection, template.location + offset * i, ground, self.duplicate_model)
+        self.report({'INFO'}, '%d copies of %s created' % (self.count, template.name))
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(OBJECT_OT_carRigStoreTemplate)
+    bpy.utils.register_class(OBJECT_OT_carRigInstantiateTemplate)
+
+
+def unregister():
+    bpy.utils.unregister_class(OBJECT_OT_carRigInstantiateTemplate)
+    bpy.utils.unregister_class(OBJECT_OT_carRigStoreTemplate)
+
+
+if __name__ == "__main__":
+    register()
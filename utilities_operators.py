@@ -1,5 +1,184 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
 import bpy
-import pprint
+from .bake_operators import WHEEL_RADII_PROPERTY, WHEELS_ROTATION_LIVE_PROPERTY, retarget_wheels_rotation, wheel_radii
+from .bone_roles import get_roles
+from .template_operators import remap_constraint_targets
+
+# names of the RNA properties which can be copied from a constraint to another, by constraint class
+constraint_properties = {}
+
+
+def writable_properties(struct):
+    """
+    Names of the writable RNA properties of a struct, computed once per RNA type.
+    Pointers come first so that the settings depending on a target (subtarget, pole_subtarget) are copied after it.
+    """
+    rna = struct.bl_rna
+    names = constraint_properties.get(rna.identifier)
+    if names is None:
+        properties = [p for p in rna.properties
+                      if not p.is_readonly and p.type != 'COLLECTION' and p.identifier != 'rna_type']
+        names = tuple(p.identifier for p in sorted(properties, key=lambda p: p.type != 'POINTER'))
+        constraint_properties[rna.identifier] = names
+    return names
+
+
+def copy_constraint(source_cns, target_constraints):
+    """Create a copy of a constraint in target_constraints. Return the copy and the names of the settings not copied."""
+    cns = target_constraints.new(source_cns.type)
+    failed = []
+    for name in writable_properties(source_cns):
+        try:
+            setattr(cns, name, getattr(source_cns, name))
+        except (AttributeError, TypeError, ValueError):
+            failed.append(name)
+    return cns, failed
+
+
+def generated_properties(ob):
+    """Names of the custom properties driving the steering and the wheels of a rig."""
+    names = ['Steering.rotation']
+    names.extend(n.replace('MCH-', '', 1) for n in get_roles(ob).names('MCH-Wheel.rotation'))
+    return names
+
+
+def transfer_constraints(source, target, bone_names=('Root',)):
+    """
+    Copy the constraints of the given pose bones from source to target, replacing the ones of target.
+    Return the names of the constraint settings which could not be copied.
+    """
+    failed = []
+    for bone_name in bone_names:
+        source_bone = source.pose.bones.get(bone_name)
+        target_bone = target.pose.bones.get(bone_name)
+        if source_bone is None or target_bone is None:
+            continue
+        for cns in list(target_bone.constraints):
+            target_bone.constraints.remove(cns)
+        for source_cns in source_bone.constraints:
+            cns, failed_names = copy_constraint(source_cns, target_bone.constraints)
+            failed.extend('%s: %s' % (cns.name, name) for name in failed_names)
+        remap_constraint_targets(target_bone.constraints, {source: target})
+    return failed
+
+
+def transfer_generated_properties(source, target, action, live=True):
+    """
+    Copy the steering and wheel rotation properties animated by the generated curves of action,
+    so that the curves animate the target. live also carries over the live wheels rotation mode.
+    """
+    names = set(generated_properties(target))
+    if action is not None:
+        names.update(fc.data_path[2:-2] for fc in action.fcurves
+                     if fc.data_path.startswith(('["Steering.rotation"]', '["Wheel.rotation.')))
+    for name in names:
+        if name in source:
+            target[name] = source[name]
+    if live and WHEELS_ROTATION_LIVE_PROPERTY in source:
+        target[WHEELS_ROTATION_LIVE_PROPERTY] = source[WHEELS_ROTATION_LIVE_PROPERTY]
+    elif WHEELS_ROTATION_LIVE_PROPERTY in target:
+        del target[WHEELS_ROTATION_LIVE_PROPERTY]
+
+
+def baked_radii(source, action):
+    """Radii of the wheels the rotation curves of action are baked for: recorded at bake time, else the ones of source."""
+    radii = action.get(WHEEL_RADII_PROPERTY)
+    return radii.to_dict() if radii is not None else wheel_radii(source)
+
+
+def transfer_animation(source, target, bone_names=('Root',), retarget_wheels=True):
+    """
+    Copy the constraints of the given pose bones from source to target and share the action of source with target,
+    along with the steering and wheel rotation properties. With retarget_wheels, the target gets its own copy
+    of the action if its wheels differ in size, with the wheel rotation curves rescaled.
+    Return the names of the constraint settings not copied.
+    """
+    failed = transfer_constraints(source, target, bone_names)
+    action = source.animation_data.action if source.animation_data is not None else None
+    if action is not None or target.animation_data is not None:
+        target.animation_data_create().action = action
+    if action is not None and retarget_wheels:
+        target.animation_data.action, _ = retarget_wheels_rotation(target, action, baked_radii(source, action))
+    transfer_generated_properties(source, target, action)
+    return failed
+
+
+TRANSFER_TRACK_NAME = 'Rigacar transfer'
+
+
+def offset_path(rig, path_offset, action, bone_name='Root'):
+    """
+    Move a rig animated by action along the path followed by its bone. Return False if the rig cannot be moved
+    without its own action: the position along a path with a fixed location is given by the animated offset factor.
+    """
+    for cns in rig.pose.bones[bone_name].constraints:
+        if cns.type != 'FOLLOW_PATH':
+            continue
+        if not cns.use_fixed_location:
+            cns.offset += path_offset
+        elif action is not None and \
+                action.fcurves.find('pose.bones["%s"].constraints["%s"].offset_factor' % (bone_name, cns.name)):
+            return False
+        else:
+            cns.offset_factor = min(max(cns.offset_factor + path_offset / 100, 0.), 1.)
+    return True
+
+
+def transfer_animation_to_many(source, targets, time_offset=0., path_offset=0., bone_names=('Root',), retarget_wheels=True):
+    """
+    Copy the constraints of the given pose bones from source to each target and play the action of source on the
+    targets through an NLA strip, so that all the rigs share a single action. The nth target (counting from 1)
+    starts n * time_offset frames (rounded) after the source and is moved along the path by n * path_offset: frames for a
+    path animation, percents of the path for a fixed location. With retarget_wheels, a target whose wheels differ in size
+    plays its own copy of the action, with the wheel rotation curves rescaled. Return a (constraint settings not copied,
+    targets which could not be moved along their path) pair.
+    """
+    source_action = source.animation_data.action if source.animation_data is not None else None
+    radii = baked_radii(source, source_action) if source_action is not None else None
+    failed = set()
+    not_moved = []
+    for n, target in enumerate(targets, start=1):
+        failed.update(transfer_constraints(source, target, bone_names))
+
+        animation_data = target.animation_data_create()
+        animation_data.action = None
+        track = animation_data.nla_tracks.get(TRANSFER_TRACK_NAME)
+        if track is not None:
+            animation_data.nla_tracks.remove(track)
+        if source_action is not None:
+            track = animation_data.nla_tracks.new()
+            track.name = TRANSFER_TRACK_NAME
+            strip = track.strips.new(source_action.name, int(round(source_action.frame_range[0] + n * time_offset)),
+                                     source_action)
+            strip.extrapolation = 'HOLD'
+            if retarget_wheels:
+                strip.action, _ = retarget_wheels_rotation(target, source_action, radii)
+        # the live wheels rotation reads the active action of the rig, the targets only get the baked curves
+        transfer_generated_properties(source, target, source_action, live=False)
+
+        if path_offset and not offset_path(target, n * path_offset, source_action, bone_names[0]):
+            not_moved.append(target.name)
+    return sorted(failed), not_moved
+
 
 class OP_CarTansferAnimation(bpy.types.Operator):
     bl_idname = 'anim.car_transfer_animation'
@@ -7,59 +186,95 @@ class OP_CarTansferAnimation(bpy.types.Operator):
     bl_description = 'Transfer follow path constraints and animation data from the Active to the Selected rig'
     bl_options = {'REGISTER', 'UNDO'}
 
-    def execute(self, context):
+    retarget_wheels: bpy.props.BoolProperty(name='Retarget wheels',
+                                            description='Rescale the wheels rotation for the wheels of each rig, '
+                                                        'copying the action only for the rigs with wheels of another size',
+                                            default=True)
 
-        selected_objs = bpy.context.selected_objects
+    def execute(self, context):
+        selected_objs = list(context.selected_objects)
 
-        if len(selected_objs) != 2:
+        if len(selected_objs) != 2 or context.object not in selected_objs:
             self.report({'ERROR'}, 'Select two objects')
-            return {'FINISHED'}
-
-        source_obj = bpy.context.object
+            return {'CANCELLED'}
 
+        source_obj = context.object
         selected_objs.remove(source_obj)
         target_obj = selected_objs[0]
 
-        pprint.pprint(source_obj)
-        pprint.pprint(target_obj)
+        if source_obj.pose is None or target_obj.pose is None or \
+           'Root' not in source_obj.pose.bones or 'Root' not in target_obj.pose.bones:
+            self.report({'ERROR'}, 'Both objects must be car rigs with a Root bone')
+            return {'CANCELLED'}
+
+        failed = transfer_animation(source_obj, target_obj, retarget_wheels=self.retarget_wheels)
+        if failed:
+            self.report({'WARNING'}, 'Transfer done, settings not copied: %s' % ', '.join(failed))
+        else:
+            self.report({'INFO'}, 'Transfer done')
+        return {'FINISHED'}
+
 
-        source_root = [b for b in source_obj.pose.bones if b.name == "Root"][0]
-        target_root = [b for b in target_obj.pose.bones if b.name == "Root"][0]
+class ANIM_OT_carBatchTransferAnimation(bpy.types.Operator):
+    bl_idname = 'anim.car_batch_transfer_animation'
+    bl_label = 'Transfer Animation to Selected'
+    bl_description = 'Transfer the follow path constraint and the action of the Active rig to all the Selected rigs, ' \
+                     'sharing the action through NLA strips'
+    bl_options = {'REGISTER', 'UNDO'}
 
-        print(source_root.constraints)
-        print(target_root.constraints)
+    time_offset: bpy.props.FloatProperty(name='Time offset',
+                                         description='Delay in frames between a rig and the next one, in the order of their names',
+                                         default=0.)
 
-        # remove constraints on target
-        for c in target_root.constraints:
-            target_root.constraints.remove(c)
+    path_offset: bpy.props.FloatProperty(name='Path offset',
+                                         description='Offset along the path between a rig and the next one: '
+                                                     'frames for a path animation, percents for a fixed location',
+                                         default=0.)
 
-        # transfer constraints from root
-        for c in source_root.constraints:
+    retarget_wheels: bpy.props.BoolProperty(name='Retarget wheels',
+                                            description='Rescale the wheels rotation for the wheels of each rig, '
+                                                        'copying the action only for the rigs with wheels of another size',
+                                            default=True)
 
-            new_const = target_root.constraints.new(c.type)
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.pose is not None and 'Root' in context.object.pose.bones
 
-            for prop in dir(c):
-                try:
-                    setattr(new_const, prop, getattr(c, prop))
-                except:
-                    pass
+    def draw(self, context):
+        self.layout.use_property_split = True
+        self.layout.use_property_decorate = False
+        self.layout.prop(self, 'time_offset')
+        self.layout.prop(self, 'path_offset')
+        self.layout.prop(self, 'retarget_wheels')
 
-        # transfer animation data
-        bpy.ops.object.make_links_data(type='ANIMATION')
+    def execute(self, context):
+        source_obj = context.object
+        targets = sorted((o for o in context.selected_objects
+                          if o is not source_obj and o.pose is not None and 'Root' in o.pose.bones),
+                         key=lambda o: o.name)
+        if not targets:
+            self.report({'ERROR'}, 'Select the rigs to animate and the source rig last')
+            return {'CANCELLED'}
 
-        self.report({'INFO'}, 'Transfer done')
+        failed, not_moved = transfer_animation_to_many(source_obj, targets, self.time_offset, self.path_offset,
+                                                       retarget_wheels=self.retarget_wheels)
+        if failed:
+            self.report({'WARNING'}, 'Settings not copied: %s' % ', '.join(failed))
+        if not_moved:
+            self.report({'WARNING'}, 'Animated offset along the path, use a time offset for: %s' % ', '.join(not_moved))
+        self.report({'INFO'}, 'Animation transferred to %d rigs' % len(targets))
         return {'FINISHED'}
 
 
 def register():
     bpy.utils.register_class(OP_CarTansferAnimation)
+    bpy.utils.register_class(ANIM_OT_carBatchTransferAnimation)
 
 
 def unregister():
+    bpy.utils.unregister_class(ANIM_OT_carBatchTransferAnimation)
     bpy.utils.unregister_class(OP_CarTansferAnimation)
 
 
 if __name__ == "__main__":
     register()
-    bpy.ops.anim.car_transfer_animation()
-